@@ -0,0 +1,300 @@
+# backend/app/compiled_forest.py
+import numpy as np
+from typing import Dict, Optional
+
+MODEL_BACKENDS = ('sklearn', 'compiled')
+
+COMPACT_FORMAT_VERSION = 1
+# Leaf class distributions are stored as integers summing to the dtype's max
+LEAF_DTYPES = ('uint8', 'uint16')
+
+
+def _smallest_uint(max_value: int):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def _float32_at_most(values: np.ndarray) -> np.ndarray:
+    """
+    float32 thresholds rounded toward -inf. Inputs are float32, so for any
+    input x, x <= rounded exactly when x <= the float64 threshold: the split
+    decisions do not change.
+    """
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def _quantize_rows(proba: np.ndarray, scale: int) -> np.ndarray:
+    """Integer rows summing exactly to `scale`, by largest-remainder rounding"""
+    scaled = proba * scale
+    quantized = np.floor(scaled)
+    short = np.rint(scale - quantized.sum(axis=1)).astype(np.intp)
+    # Hand the missing units to the classes with the largest remainders
+    rank = np.argsort(np.argsort(quantized - scaled, axis=1, kind='stable'), axis=1)
+    quantized += rank < short[:, np.newaxis]
+    return quantized
+
+
+class CompiledForest:
+    """
+    Array-based evaluator for a fitted sklearn RandomForestClassifier.
+
+    All trees are flattened into contiguous node arrays (feature, threshold,
+    left, right, missing-go-left, leaf probabilities) with leaves pointing to
+    themselves, so a batch is evaluated for every tree at once by stepping
+    all (tree, row) cursors `depth` times with NumPy fancy indexing. No
+    joblib dispatch or per-tree Python calls are involved.
+
+    Results are bit-identical to `predict_proba` of the source forest run
+    with n_jobs=1: inputs are cast to float32 like sklearn, each tree's leaf
+    counts are normalised the same way and trees are summed in order.
+
+    `save_compact` writes only these arrays, in the smallest dtypes that hold
+    them, with float32 thresholds and integer leaf distributions;
+    `load_compact` serves such a file without sklearn objects. `prune` cuts
+    trees to a depth or count before export.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, leaf_proba,
+                 roots, depth, classes, n_features_in, feature_names=None, leaf_scale=1):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.depth = depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features_in
+        self.feature_names_ = feature_names
+        self.n_estimators = len(roots)
+        # leaf_proba holds probabilities times leaf_scale (integers in compact files)
+        self.leaf_scale = leaf_scale
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "CompiledForest":
+        """Flatten a fitted single-output forest classifier"""
+        if getattr(forest, 'n_outputs_', 1) != 1 or not hasattr(forest, 'classes_'):
+            raise TypeError("Only single-output forest classifiers can be compiled")
+
+        features, thresholds, lefts, rights, missing, probas, roots = [], [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            nodes = np.arange(n)
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            go_left = getattr(tree, 'missing_go_to_left', None)
+            missing.append(np.zeros(n, dtype=bool) if go_left is None
+                           else np.where(is_leaf, True, np.asarray(go_left, dtype=bool)))
+
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :forest.n_classes_].astype(np.float64)
+            normalizer = value.sum(axis=1)
+            normalizer[normalizer == 0.0] = 1.0
+            probas.append(value / normalizer[:, np.newaxis])
+
+            roots.append(offset)
+            offset += n
+            depth = max(depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            missing_left=np.concatenate(missing),
+            leaf_proba=np.concatenate(probas),
+            roots=np.array(roots, dtype=np.intp),
+            depth=depth,
+            classes=forest.classes_,
+            n_features_in=forest.n_features_in_,
+            feature_names=getattr(forest, 'feature_names_in_', getattr(forest, 'feature_names_', None))
+        )
+
+    def apply(self, X) -> np.ndarray:
+        """(n_trees, n_rows) flat index of the leaf each row reaches in each tree"""
+        # sklearn evaluates trees on float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[-1]} features, but the forest expects {self.n_features_in_}")
+
+        rows = np.arange(len(X))[np.newaxis, :]
+        nodes = np.repeat(self.roots[:, np.newaxis], len(X), axis=1)
+        for _ in range(self.depth):
+            values = X[rows, self.feature[nodes]]
+            go_left = values <= self.threshold[nodes]
+            go_left |= np.isnan(values) & self.missing_left[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Class probabilities averaged over the trees, in tree order"""
+        per_tree = self.leaf_proba[self.apply(X)]  # (n_trees, n_rows, n_classes)
+        # cumsum adds the trees strictly one after another, like sklearn
+        return np.cumsum(per_tree, axis=0, dtype=np.float64)[-1] / (self.n_estimators * self.leaf_scale)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def prune(self, max_depth: Optional[int] = None, n_estimators: Optional[int] = None) -> "CompiledForest":
+        """
+        Forest of the first `n_estimators` trees cut at `max_depth`: nodes at
+        that depth become leaves predicting their training class distribution.
+        Needs the per-node distributions of a forest built by from_sklearn.
+        """
+        n_trees = self.n_estimators if n_estimators is None else max(1, min(n_estimators, self.n_estimators))
+        limit = self.depth if max_depth is None else max(0, min(max_depth, self.depth))
+        end = int(self.roots[n_trees]) if n_trees < self.n_estimators else len(self.feature)
+
+        nodes = np.arange(end)
+        left = self.left[:end].astype(np.intp)
+        right = self.right[:end].astype(np.intp)
+        is_leaf = left == nodes
+
+        # Depth of every node reachable within `limit` levels, -1 for the rest
+        depth = np.full(end, -1)
+        level = self.roots[:n_trees].astype(np.intp)
+        for d in range(limit + 1):
+            depth[level] = d
+            internal = level[~is_leaf[level]]
+            level = np.concatenate((left[internal], right[internal]))
+
+        keep = depth >= 0
+        cut = keep & (depth == limit) & ~is_leaf
+        if cut.any() and not self.leaf_proba[:end][cut].any(axis=1).all():
+            raise ValueError("Internal node distributions are unavailable; prune before save_compact")
+
+        new_index = np.cumsum(keep) - 1
+        kept = nodes[keep]
+        leaf = cut[keep] | is_leaf[keep]
+        own = new_index[kept]
+        return CompiledForest(
+            feature=np.where(leaf, 0, self.feature[kept]).astype(self.feature.dtype),
+            threshold=np.where(leaf, np.inf, self.threshold[kept]).astype(self.threshold.dtype),
+            left=np.where(leaf, own, new_index[left[kept]]).astype(np.intp),
+            right=np.where(leaf, own, new_index[right[kept]]).astype(np.intp),
+            missing_left=np.where(leaf, True, self.missing_left[kept]),
+            leaf_proba=self.leaf_proba[kept],
+            roots=new_index[self.roots[:n_trees]].astype(np.intp),
+            depth=int(depth[keep].max()),
+            classes=self.classes_,
+            n_features_in=self.n_features_in_,
+            feature_names=self.feature_names_,
+            leaf_scale=self.leaf_scale
+        )
+
+    def save_compact(self, file, leaf_dtype: str = 'uint16'):
+        """
+        Write the inference arrays to an .npz file (path or file object):
+        float32 thresholds rounded down, node indices and features in the
+        smallest unsigned dtype, missing-value flags as bits and only the
+        leaves' class distributions, quantised to `leaf_dtype`.
+        """
+        if leaf_dtype not in LEAF_DTYPES:
+            raise ValueError(f"Unknown leaf dtype {leaf_dtype!r}, expected one of {LEAF_DTYPES}")
+        n_nodes = len(self.feature)
+        leaves = np.flatnonzero(self.left == np.arange(n_nodes))
+        scale = int(np.iinfo(leaf_dtype).max)
+        proba = self.leaf_proba[leaves].astype(np.float64) / self.leaf_scale
+        index_dtype = _smallest_uint(n_nodes - 1)
+
+        arrays = {
+            'format_version': np.array(COMPACT_FORMAT_VERSION),
+            'feature': self.feature.astype(_smallest_uint(max(self.n_features_in_ - 1, 0))),
+            'threshold': _float32_at_most(np.asarray(self.threshold, dtype=np.float64)),
+            'left': self.left.astype(index_dtype),
+            'right': self.right.astype(index_dtype),
+            'missing_left': np.packbits(self.missing_left),
+            'leaves': leaves.astype(index_dtype),
+            'leaf_values': _quantize_rows(proba, scale).astype(leaf_dtype),
+            'roots': self.roots.astype(index_dtype),
+            'depth': np.array(self.depth),
+            'classes': np.asarray(self.classes_),
+            'n_features_in': np.array(self.n_features_in_)
+        }
+        if self.feature_names_ is not None:
+            arrays['feature_names'] = np.array([str(name) for name in self.feature_names_])
+        np.savez(file, **arrays)
+
+    @classmethod
+    def load_compact(cls, file) -> "CompiledForest":
+        """Forest from a save_compact file; arrays stay in their stored dtypes"""
+        with np.load(file, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version != COMPACT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported compact forest format {version}")
+            feature = data['feature']
+            leaf_values = data['leaf_values']
+            leaf_proba = np.zeros((len(feature), leaf_values.shape[1]), dtype=leaf_values.dtype)
+            leaf_proba[data['leaves']] = leaf_values
+            feature_names = data['feature_names'].tolist() if 'feature_names' in data else None
+            return cls(
+                feature=feature,
+                threshold=data['threshold'],
+                left=data['left'],
+                right=data['right'],
+                missing_left=np.unpackbits(data['missing_left'], count=len(feature)).astype(bool),
+                leaf_proba=leaf_proba,
+                roots=data['roots'],
+                depth=int(data['depth']),
+                classes=data['classes'],
+                n_features_in=int(data['n_features_in']),
+                feature_names=feature_names,
+                leaf_scale=int(np.iinfo(leaf_values.dtype).max)
+            )
+
+
+def prediction_drift(reference, candidate, X, y=None) -> Dict:
+    """How far `candidate` strays from `reference` on rows X (and labels y, if given)"""
+    expected = reference.predict_proba(X)
+    actual = candidate.predict_proba(X)
+    expected_labels = reference.classes_.take(np.argmax(expected, axis=1), axis=0)
+    actual_labels = candidate.classes_.take(np.argmax(actual, axis=1), axis=0)
+    drift = {
+        "rows": len(X),
+        "max_proba_diff": float(np.abs(actual - expected).max()),
+        "label_agreement": float(np.mean(actual_labels == expected_labels))
+    }
+    if y is not None:
+        drift["reference_accuracy"] = float(np.mean(expected_labels == y))
+        drift["candidate_accuracy"] = float(np.mean(actual_labels == y))
+    return drift
+
+
+def compile_model(model, backend: str = 'compiled', check_rows: Optional[int] = 64):
+    """
+    Serving model for `backend`: the model itself for 'sklearn', or its
+    CompiledForest for 'compiled'. Models that cannot be compiled, or whose
+    compiled output differs from sklearn on `check_rows` random probe rows,
+    are returned unchanged.
+    """
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend {backend!r}, expected one of {MODEL_BACKENDS}")
+    if backend == 'sklearn':
+        return model
+
+    try:
+        compiled = CompiledForest.from_sklearn(model)
+    except (TypeError, AttributeError) as e:
+        print(f"⚠️  Compiled backend unavailable for {type(model).__name__}: {e}")
+        return model
+
+    if check_rows:
+        probe = np.random.default_rng(0).normal(scale=10.0, size=(check_rows, compiled.n_features_in_))
+        if not np.array_equal(compiled.predict_proba(probe), model.predict_proba(probe)):
+            print("⚠️  Compiled forest disagrees with sklearn, serving the sklearn model")
+            return model
+
+    return compiled
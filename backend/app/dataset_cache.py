@@ -0,0 +1,115 @@
+# backend/app/dataset_cache.py
+import glob
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from scipy.io import loadmat
+from typing import Dict, Tuple
+
+# Accelerometer channels stored in CWRU .mat files (drive end, fan end, base)
+CWRU_CHANNELS = ('DE_time', 'FE_time', 'BA_time')
+
+
+class RecordingCache:
+    """
+    Decoded CWRU recordings backed by memory-mapped .npy shadow files.
+
+    The first request for a .mat file decodes it once with loadmat and writes
+    every accelerometer channel to `<stem>.<channel>.<mtime_ns>-<size>.npy` in
+    `cache_dir`. Afterwards channels are opened with mmap_mode='r', so segment
+    requests are zero-copy slices. Open channels are shared across requests
+    through an LRU bounded by mapped bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], np.ndarray]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._decode_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def _source_key(mat_path: str) -> Tuple[int, int]:
+        st = os.stat(mat_path)
+        return st.st_mtime_ns, st.st_size
+
+    def _shadow_path(self, mat_path: str, channel: str, key: Tuple[int, int]) -> str:
+        stem = os.path.splitext(os.path.basename(mat_path))[0]
+        return os.path.join(self.cache_dir, f"{stem}.{channel}.{key[0]}-{key[1]}.npy")
+
+    def _decode_lock(self, mat_path: str) -> threading.Lock:
+        with self._lock:
+            return self._decode_locks.setdefault(mat_path, threading.Lock())
+
+    def _decode(self, mat_path: str, key: Tuple[int, int]):
+        """Extract every channel of a .mat file into .npy shadow files"""
+        mat_data = loadmat(mat_path)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        for channel in CWRU_CHANNELS:
+            channel_keys = [k for k in mat_data.keys() if channel in k]
+            if not channel_keys:
+                continue
+
+            data = np.ascontiguousarray(mat_data[channel_keys[0]].ravel(), dtype=np.float64)
+            shadow = self._shadow_path(mat_path, channel, key)
+
+            # Write-then-rename so concurrent workers never map a partial file
+            tmp_path = f"{shadow}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, data)
+            os.replace(tmp_path, shadow)
+
+            # Drop shadows left over from older versions of the source file
+            stem = os.path.splitext(os.path.basename(mat_path))[0]
+            for stale in glob.glob(os.path.join(self.cache_dir, f"{glob.escape(stem)}.{channel}.*.npy")):
+                if stale != shadow:
+                    os.remove(stale)
+
+    def _remember(self, entry_key: Tuple[str, str], source_key: Tuple[int, int], array: np.ndarray):
+        with self._lock:
+            previous = self._entries.pop(entry_key, None)
+            if previous is not None:
+                self._bytes -= previous[1].nbytes
+
+            self._entries[entry_key] = (source_key, array)
+            self._bytes += array.nbytes
+
+            # Evict least recently used maps, always keeping the newest one
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def get_channel(self, mat_path: str, channel: str = 'DE_time') -> np.ndarray:
+        """Read-only memory-mapped view of one channel of a .mat recording"""
+        if channel not in CWRU_CHANNELS:
+            raise ValueError(f"Unknown channel {channel!r}")
+
+        mat_path = os.path.abspath(mat_path)
+        source_key = self._source_key(mat_path)
+        entry_key = (mat_path, channel)
+
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] == source_key:
+                self._entries.move_to_end(entry_key)
+                return entry[1]
+
+        # One decode per file, even when many requests miss at once
+        with self._decode_lock(mat_path):
+            shadow = self._shadow_path(mat_path, channel, source_key)
+            if not os.path.exists(shadow):
+                self._decode(mat_path, source_key)
+            if not os.path.exists(shadow):
+                raise KeyError(f"No {channel} data found in {mat_path}")
+            array = np.load(shadow, mmap_mode='r')
+
+        self._remember(entry_key, source_key, array)
+        return array
+
+    def get_segment(self, mat_path: str, start: int, length: int,
+                    channel: str = 'DE_time') -> np.ndarray:
+        """Zero-copy slice [start, start + length) of a recording channel"""
+        return self.get_channel(mat_path, channel)[start:start + length]
@@ -0,0 +1,43 @@
+# backend/app/decimation.py
+import numpy as np
+from typing import Tuple
+
+# Report plots: 9 x 3.2 in figures rasterized at 200 dpi
+PLOT_FIGSIZE = (9, 3.2)
+PLOT_DPI = 200
+# One min/max bucket per horizontal pixel of the figure
+PLOT_MAX_BUCKETS = int(PLOT_FIGSIZE[0] * PLOT_DPI)
+
+
+def minmax_envelope(x: np.ndarray, y: np.ndarray, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce a line to at most 2 * n_buckets + 2 points for plotting.
+
+    The samples are split into `n_buckets` equal index ranges and each range
+    keeps its minimum and maximum in original order, plus the first and last
+    point. With one bucket per horizontal pixel the rasterized line and its
+    filled area look the same as the full-resolution plot, because every
+    pixel column still spans the same vertical range.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if n <= 2 * n_buckets + 2:
+        return x, y
+
+    bucket = -(-n // n_buckets)  # ceil
+    n_full = -(-n // bucket)
+
+    # Pad the last bucket with its final sample so the samples reshape evenly
+    padded = np.empty(n_full * bucket, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    blocks = padded.reshape(n_full, bucket)
+
+    starts = np.arange(n_full) * bucket
+    i_min = np.minimum(starts + blocks.argmin(axis=1), n - 1)
+    i_max = np.minimum(starts + blocks.argmax(axis=1), n - 1)
+
+    idx = np.column_stack((np.minimum(i_min, i_max), np.maximum(i_min, i_max))).ravel()
+    idx = np.unique(np.concatenate(([0], idx, [n - 1])))
+    return x[idx], y[idx]
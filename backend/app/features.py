@@ -0,0 +1,346 @@
+# backend/app/features.py
+import numpy as np
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from app.spectral import WELCH_NPERSEG, Spectrum
+
+# Column order the Random Forest was trained on (testing/train_real_model.py)
+FEATURE_NAMES = [
+    'mean',
+    'std',
+    'rms',
+    'peak',
+    'peak_to_peak',
+    'crest_factor',
+    'skewness',
+    'kurtosis',
+    'clearance_factor',
+    'shape_factor',
+    'impulse_factor',
+    'freq_mean',
+    'freq_std',
+    'freq_peak'
+]
+
+# Feature set of the legacy FaultPredictor models (app/preprocessing.py)
+SPECTRUM_FEATURE_NAMES = [
+    'rms',
+    'peak',
+    'crest_factor',
+    'kurtosis',
+    'skewness',
+    'std_dev',
+    'peak_to_peak',
+    'dominant_frequency',
+    'peak_fft_magnitude',
+    'top_freq_1',
+    'top_freq_2',
+    'top_freq_3',
+    'spectral_entropy',
+    'frequency_centroid'
+]
+
+FEATURE_FS = 12000
+MIN_SIGNAL_LENGTH = 100
+# Bump when a feature's definition changes; cached training features are keyed on it
+FEATURE_SET_VERSION = 1
+
+# Values supplied by the caller rather than computed
+PLAN_INPUTS = ('x', 'fs', 'nperseg')
+
+# name -> (dependencies, function of the dependency values)
+_NODES: Dict[str, Tuple[Tuple[str, ...], Callable]] = {}
+
+
+def _node(name: str, *deps: str):
+    """Register a feature or shared intermediate computed from `deps`"""
+    def register(fn):
+        _NODES[name] = (deps, fn)
+        return fn
+    return register
+
+
+def _safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """Element-wise num / den, 0 where den is not positive (matches `x / y if y > 0 else 0`)"""
+    out = np.zeros(np.broadcast(num, den).shape)
+    np.divide(num, den, out=out, where=den > 0)
+    return out
+
+
+def _zero_variance(mean: np.ndarray, m2: np.ndarray) -> np.ndarray:
+    """Where scipy.stats treats the variance as zero and returns nan moments"""
+    eps = np.finfo(np.float64).resolution
+    return m2 <= (eps * mean) ** 2
+
+
+# --- Shared intermediates over an (n_segments, n_samples) array `x` ---
+# All reductions run along the last axis, one value per segment.
+
+_node('mean', 'x')(lambda x: x.mean(axis=1))
+_node('centered', 'x', 'mean')(lambda x, mean: x - mean[:, np.newaxis])
+_node('centered_sq', 'centered')(lambda centered: centered ** 2)
+_node('m2', 'centered_sq')(lambda centered_sq: centered_sq.mean(axis=1))
+_node('m3', 'centered_sq', 'centered')(lambda centered_sq, centered: (centered_sq * centered).mean(axis=1))
+_node('m4', 'centered_sq')(lambda centered_sq: (centered_sq ** 2).mean(axis=1))
+_node('abs', 'x')(np.abs)
+_node('abs_mean', 'abs')(lambda abs_x: abs_x.mean(axis=1))
+_node('sqrt_abs_mean', 'abs')(lambda abs_x: np.sqrt(abs_x).mean(axis=1))
+
+
+# One Spectrum per call: the Welch PSD and the FFT are each computed at most once
+_node('spectral', 'x', 'fs', 'nperseg')(Spectrum)
+_node('welch', 'spectral')(lambda spectral: spectral.welch)
+_node('freqs', 'welch')(lambda pair: pair[0])
+_node('psd', 'welch')(lambda pair: pair[1])
+_node('psd_sum', 'psd')(lambda psd: psd.sum(axis=-1))
+
+
+@_node('spectrum', 'spectral')
+def _spectrum(spectral):
+    """Positive-frequency FFT bins (DC and Nyquist excluded) and their magnitudes"""
+    positive = slice(1, (spectral.n + 1) // 2)
+    return spectral.freqs[positive], spectral.magnitude[:, positive]
+
+
+_node('spectrum_freqs', 'spectrum')(lambda pair: pair[0])
+_node('spectrum_mag', 'spectrum')(lambda pair: pair[1])
+
+
+@_node('top_freqs', 'spectrum_freqs', 'spectrum_mag')
+def _top_freqs(freqs, mag):
+    """(n, 3) frequencies of the three largest FFT bins, largest first"""
+    k = min(3, mag.shape[1])
+    top = np.argpartition(mag, -k, axis=1)[:, -k:]
+    order = np.argsort(np.take_along_axis(mag, top, axis=1), axis=1)[:, ::-1]
+    out = np.zeros((len(mag), 3))
+    out[:, :k] = freqs[np.take_along_axis(top, order, axis=1)]
+    return out
+
+
+# --- Training features (FEATURE_NAMES) ---
+
+_node('std', 'm2')(np.sqrt)
+_node('rms', 'x')(lambda x: np.sqrt((x ** 2).mean(axis=1)))
+_node('peak', 'abs')(lambda abs_x: abs_x.max(axis=1))
+_node('peak_to_peak', 'x')(lambda x: x.max(axis=1) - x.min(axis=1))
+_node('crest_factor', 'peak', 'rms')(_safe_divide)
+_node('clearance_factor', 'peak', 'sqrt_abs_mean')(lambda peak, sam: _safe_divide(peak, sam ** 2))
+_node('shape_factor', 'rms', 'abs_mean')(_safe_divide)
+_node('impulse_factor', 'peak', 'abs_mean')(_safe_divide)
+
+
+@_node('skewness', 'mean', 'm2', 'm3')
+def _skewness(mean, m2, m3):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(_zero_variance(mean, m2), np.nan, m3 / m2 ** 1.5)
+
+
+@_node('kurtosis', 'mean', 'm2', 'm4')
+def _kurtosis(mean, m2, m4):
+    """Excess (Fisher) kurtosis"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(_zero_variance(mean, m2), np.nan, m4 / m2 ** 2 - 3.0)
+
+
+_node('freq_mean', 'freqs', 'psd', 'psd_sum')(
+    lambda freqs, psd, psd_sum: _safe_divide((psd * freqs).sum(axis=-1), psd_sum)
+)
+
+
+@_node('freq_std', 'freqs', 'psd', 'psd_sum', 'freq_mean')
+def _freq_std(freqs, psd, psd_sum, freq_mean):
+    spread = ((freqs[np.newaxis, :] - freq_mean[:, np.newaxis]) ** 2 * psd).sum(axis=-1)
+    return np.sqrt(_safe_divide(spread, psd_sum))
+
+
+_node('freq_peak', 'freqs', 'psd')(lambda freqs, psd: freqs[np.argmax(psd, axis=-1)])
+
+# --- Legacy FFT features (SPECTRUM_FEATURE_NAMES) ---
+
+_node('std_dev', 'm2')(np.sqrt)
+_node('dominant_frequency', 'spectrum_freqs', 'spectrum_mag')(
+    lambda freqs, mag: freqs[np.argmax(mag, axis=1)]
+)
+_node('peak_fft_magnitude', 'spectrum_mag')(lambda mag: mag.max(axis=1))
+_node('top_freq_1', 'top_freqs')(lambda top: top[:, 0])
+_node('top_freq_2', 'top_freqs')(lambda top: top[:, 1])
+_node('top_freq_3', 'top_freqs')(lambda top: top[:, 2])
+
+
+@_node('spectral_entropy', 'spectrum_mag')
+def _spectral_entropy(mag):
+    psd = mag ** 2
+    psd_norm = psd / psd.sum(axis=1, keepdims=True)
+    return -(psd_norm * np.log2(psd_norm + 1e-12)).sum(axis=1)
+
+
+_node('frequency_centroid', 'spectrum_freqs', 'spectrum_mag')(
+    lambda freqs, mag: (mag * freqs).sum(axis=1) / mag.sum(axis=1)
+)
+
+# Every feature a plan may ask for (the remaining nodes are intermediates)
+AVAILABLE_FEATURES = tuple(dict.fromkeys(FEATURE_NAMES + SPECTRUM_FEATURE_NAMES))
+
+
+class FeaturePlan:
+    """
+    Lazily evaluated subset of the registered features.
+
+    Each feature and shared intermediate (centred moments, |x|, Welch PSD,
+    FFT spectrum, ...) is a node that declares its dependencies. Evaluating
+    a plan computes each needed node at most once per call and never
+    touches nodes the requested features do not depend on, so a model
+    trained on time-domain features alone skips the spectral work.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        unknown = [name for name in names if name not in AVAILABLE_FEATURES]
+        if unknown:
+            raise ValueError(f"Unknown features: {unknown}")
+        self.names = tuple(names)
+        self.nodes = self._closure(self.names)
+
+    @staticmethod
+    def _closure(names: Sequence[str]) -> FrozenSet[str]:
+        needed = set()
+        stack = list(names)
+        while stack:
+            name = stack.pop()
+            if name in needed or name in PLAN_INPUTS:
+                continue
+            needed.add(name)
+            stack.extend(_NODES[name][0])
+        return frozenset(needed)
+
+    @property
+    def intermediates(self) -> List[str]:
+        """Nodes computed for this plan that are not themselves requested"""
+        return sorted(self.nodes.difference(self.names))
+
+    def compute(self, values: Dict[str, object]) -> np.ndarray:
+        """
+        (n_segments, len(names)) matrix from the given inputs/intermediates.
+        Nodes already present in `values` are used as-is instead of computed.
+        """
+        memo = dict(values)
+
+        def resolve(name):
+            if name not in memo:
+                if name in PLAN_INPUTS:
+                    raise KeyError(f"Feature plan needs input {name!r}")
+                deps, fn = _NODES[name]
+                memo[name] = fn(*[resolve(dep) for dep in deps])
+            return memo[name]
+
+        try:
+            return np.column_stack([resolve(name) for name in self.names])
+        finally:
+            # resolve() refers to itself, so without this the intermediates
+            # would live until the cycle collector runs
+            memo.clear()
+
+    def evaluate(self, segments: np.ndarray, fs: float = FEATURE_FS,
+                 nperseg: int = WELCH_NPERSEG, spectrum: Optional[Spectrum] = None) -> np.ndarray:
+        """
+        Features for an (n_segments, n_samples) float64 array. Pass the
+        segments' Spectrum to reuse transforms computed elsewhere.
+        """
+        values = {'x': segments, 'fs': fs, 'nperseg': nperseg}
+        if spectrum is not None:
+            values['spectral'] = spectrum
+        return self.compute(values)
+
+
+@lru_cache(maxsize=64)
+def feature_plan(names: Tuple[str, ...] = tuple(FEATURE_NAMES)) -> FeaturePlan:
+    """Shared FeaturePlan for a tuple of feature names"""
+    return FeaturePlan(names)
+
+
+def model_feature_names(model) -> List[str]:
+    """
+    Feature columns a fitted model expects, in order: `feature_names_in_`
+    (fit on a DataFrame) or `feature_names_` (set by the training script),
+    else the full FEATURE_NAMES list when the column count matches.
+    """
+    for attr in ('feature_names_in_', 'feature_names_'):
+        names = getattr(model, attr, None)
+        if names is not None:
+            return [str(name) for name in names]
+
+    n_features = getattr(model, 'n_features_in_', len(FEATURE_NAMES))
+    if n_features != len(FEATURE_NAMES):
+        raise ValueError(f"Model expects {n_features} features but does not record their names")
+    return list(FEATURE_NAMES)
+
+
+def assemble_features(mean, m2, m3, m4, rms, peak, peak_to_peak, abs_mean,
+                      sqrt_abs_mean, freqs, psd) -> np.ndarray:
+    """Build the (n_segments, 14) matrix from per-segment moments and a PSD"""
+    return feature_plan().compute({
+        'mean': mean, 'm2': m2, 'm3': m3, 'm4': m4, 'rms': rms, 'peak': peak,
+        'peak_to_peak': peak_to_peak, 'abs_mean': abs_mean,
+        'sqrt_abs_mean': sqrt_abs_mean, 'freqs': freqs, 'psd': psd
+    })
+
+
+def extract_features_batch(segments, fs: float = FEATURE_FS,
+                           nperseg: int = WELCH_NPERSEG,
+                           names: Sequence[str] = FEATURE_NAMES,
+                           spectrum: Optional[Spectrum] = None) -> np.ndarray:
+    """
+    Extract features from an (n_segments, n_samples) array.
+
+    Every statistic is an axis-wise reduction and the PSD is one batched
+    Welch call, so the per-segment Python overhead of the 1-D version is gone.
+    Returns an (n_segments, len(names)) float64 matrix in `names` order.
+    """
+    x = np.asarray(segments, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[np.newaxis, :]
+    if x.ndim != 2:
+        raise ValueError("Expected an (n_segments, n_samples) array")
+    if x.shape[1] < MIN_SIGNAL_LENGTH:
+        raise ValueError("Signal too short")
+
+    return feature_plan(tuple(names)).evaluate(x, fs=fs, nperseg=nperseg, spectrum=spectrum)
+
+
+def features_to_dict(row: Sequence[float], names: Sequence[str] = FEATURE_NAMES) -> Dict[str, float]:
+    """Map one feature row to the {name: value} dict returned by the API"""
+    return {name: float(value) for name, value in zip(names, row)}
+
+
+def extract_features(signal, fs: float = FEATURE_FS,
+                     names: Sequence[str] = FEATURE_NAMES,
+                     spectrum: Optional[Spectrum] = None) -> Dict[str, float]:
+    """Extract features in EXACT same order as training (optionally from the signal's Spectrum)"""
+    signal = np.asarray(signal, dtype=np.float64)
+
+    if signal.ndim != 1 or len(signal) < MIN_SIGNAL_LENGTH:
+        raise ValueError("Signal too short")
+
+    row = extract_features_batch(signal, fs=fs, names=names, spectrum=spectrum)[0]
+    return features_to_dict(row, names)
+
+
+def extract_features_many(signals: List, fs: float = FEATURE_FS,
+                          names: Sequence[str] = FEATURE_NAMES) -> np.ndarray:
+    """
+    Extract features for signals of varying length.
+
+    Signals are grouped by length so each group runs through one batched
+    extraction; rows come back in input order.
+    """
+    arrays = [np.asarray(s, dtype=np.float64) for s in signals]
+    X = np.empty((len(arrays), len(names)))
+
+    groups: Dict[int, List[int]] = {}
+    for i, arr in enumerate(arrays):
+        groups.setdefault(len(arr), []).append(i)
+
+    for idx in groups.values():
+        X[idx] = extract_features_batch(np.stack([arrays[i] for i in idx]), fs=fs, names=names)
+
+    return X
@@ -0,0 +1,167 @@
+# backend/app/inference.py
+import asyncio
+import bisect
+import threading
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# predict_fn(X, model) -> (probabilities, classes)
+PredictFn = Callable[[np.ndarray, object], Tuple[np.ndarray, np.ndarray]]
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+WAIT_MS_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    """Fixed-bucket histogram; each bucket counts observations <= its bound"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self.count, self.sum
+        return {
+            "buckets": {**{str(b): c for b, c in zip(self.buckets, counts)}, "+Inf": counts[-1]},
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0
+        }
+
+
+class InferenceScheduler:
+    """
+    Dynamic micro-batching for model inference.
+
+    Callers submit feature rows and await their probabilities. Rows queued by
+    concurrent callers are stacked into one matrix and sent to `predict_fn`
+    when `max_batch_size` rows are waiting or the oldest request has waited
+    `max_wait` seconds, so the per-call model overhead is paid once per batch.
+    Requests are never split across batches.
+
+    Each request names the `model` (e.g. the model version it started with)
+    that must score it; a batch only stacks consecutive requests for the same
+    model, so a hot swap never mixes versions within a request.
+    """
+
+    def __init__(self, predict_fn: PredictFn, max_batch_size: int = 64,
+                 max_wait: float = 0.002):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(WAIT_MS_BUCKETS)
+        self.flushes = 0
+        self.rows = 0
+
+        # Model calls run on one worker thread, off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+        self._loop = None
+        self._task = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue: deque = deque()
+            self._pending_rows = 0
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    @property
+    def pending_rows(self) -> int:
+        """Rows waiting for the next flush"""
+        return self._pending_rows if self._task is not None else 0
+
+    async def predict_proba(self, rows, model=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Probabilities for an (n, n_features) block of rows from `model`, and the class labels"""
+        self._ensure_started()
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+
+        future = self._loop.create_future()
+        self._queue.append((rows, future, self._loop.time(), model))
+        self._pending_rows += len(rows)
+        self._wakeup.set()
+
+        return await future
+
+    def _take_batch(self) -> List:
+        batch = [self._queue.popleft()]
+        size, model = len(batch[0][0]), batch[0][3]
+        while (self._queue and self._queue[0][3] is model
+               and size + len(self._queue[0][0]) <= self.max_batch_size):
+            request = self._queue.popleft()
+            batch.append(request)
+            size += len(request[0])
+        self._pending_rows -= size
+        return batch
+
+    async def _run(self):
+        loop = self._loop
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Wait for a full batch or the oldest request's deadline
+            deadline = self._queue[0][2] + self.max_wait
+            while self._pending_rows < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = self._take_batch()
+            now = loop.time()
+            for _, _, enqueued_at, _ in batch:
+                self.queue_wait_ms.observe((now - enqueued_at) * 1000)
+
+            X = np.vstack([rows for rows, _, _, _ in batch])
+            self.batch_sizes.observe(len(X))
+            self.flushes += 1
+            self.rows += len(X)
+
+            try:
+                probabilities, classes = await loop.run_in_executor(self._executor, self.predict_fn, X, batch[0][3])
+            except Exception as e:
+                for _, future, _, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for rows, future, _, _ in batch:
+                if not future.done():
+                    future.set_result((probabilities[offset:offset + len(rows)], classes))
+                offset += len(rows)
+
+    def stats(self) -> Dict:
+        """Scheduler settings, counters and histograms"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "pending_rows": self.pending_rows,
+            "batch_size": self.batch_sizes.snapshot(),
+            "queue_wait_ms": self.queue_wait_ms.snapshot()
+        }
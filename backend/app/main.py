@@ -1,22 +1,36 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from typing import List
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Union
 import numpy as np
-import joblib
-from scipy import stats
-from scipy.signal import welch
-from scipy.io import loadmat
 import io
+import json
 import time
 import asyncio
 import os
 from datetime import datetime
 
-# Import the report generator
-from app.report_generator import ReportGenerator
+# Import the report renderer (ReportGenerator runs in its worker processes)
+from app.report_worker import ReportRenderer, ReportTimeout
+from app.report_cache import ReportCache, report_key
+from app.report_jobs import ReportJobQueue
+from app.signal_io import RAW_SAMPLE_DTYPES, read_signal_body, signal_body_openapi
+from app.dataset_cache import RecordingCache
+from app.inference import InferenceScheduler
+from app.model_registry import ModelRegistry
+from app.online_learning import OnlineLearner, WindowLog
+from app.shadow import ShadowEvaluator
+from app.features import (
+    FEATURE_FS, MIN_SIGNAL_LENGTH, WELCH_NPERSEG, extract_features, extract_features_batch,
+    extract_features_many, features_to_dict, model_feature_names
+)
+from app.segmentation import iter_segment_chunks, segment_count
+from app.spectral import SPECTRUM_MAX_FREQ, Spectrum
+from app.stream_hub import StreamHub
+from app.streaming import SampleRing, SlidingWindowFeatures, encode_frame, format_sse
 
 app = FastAPI(title="Vibration Fault Detection API")
 
@@ -29,148 +43,397 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load trained model
-model = joblib.load('models/rf_model_real.pkl')
+# Trained models in backend/models and ml/models, loaded on first use and
+# hot-swappable through POST /models/{name}/reload
+MODEL_DIRS = ['models', '../ml/models']
+SERVING_MODEL = os.environ.get('SERVING_MODEL', 'rf_model_real')
+# 'compiled' serves forests from flattened arrays (same outputs, no joblib dispatch)
+MODEL_BACKEND = os.environ.get('MODEL_BACKEND', 'compiled')
+registry = ModelRegistry(MODEL_DIRS, backend=MODEL_BACKEND)
+
+def serving_model():
+    """Active version of the serving model; hold on to it for a whole request"""
+    return registry.current(SERVING_MODEL)
+
+def serving_features(version):
+    """Feature columns of a serving model version; only these are extracted"""
+    return model_feature_names(version.model)
+
+def predict_with_serving_model(X, version):
+    """Batch probabilities from the model version its requests started with"""
+    active = version.model
+    start = time.perf_counter()
+    probabilities = active.predict_proba(X)
+    if shadow is not None:
+        shadow.observe_latency(SERVING_MODEL, (time.perf_counter() - start) * 1000)
+    return probabilities, active.classes_
+
+# Candidate model scored in the background on a sample of production rows,
+# e.g. SHADOW_MODEL=mlp_real SHADOW_SCALER=scaler_real SHADOW_LABEL_ENCODER=label_encoder_real
+SHADOW_MODEL = os.environ.get('SHADOW_MODEL') or None
+SHADOW_SCALER = os.environ.get('SHADOW_SCALER') or None
+SHADOW_LABEL_ENCODER = os.environ.get('SHADOW_LABEL_ENCODER') or None
+
+def predict_with_shadow_model(X):
+    """Labels from the shadow model, with its optional scaler and label encoder"""
+    if SHADOW_SCALER:
+        X = registry.current(SHADOW_SCALER).model.transform(X)
+    labels = registry.current(SHADOW_MODEL).model.predict(X)
+    if SHADOW_LABEL_ENCODER:
+        labels = registry.current(SHADOW_LABEL_ENCODER).model.inverse_transform(labels)
+    return np.asarray(labels).tolist()
+
+# Rendered PDFs by content (signal, sampling rate, model version)
+report_cache = ReportCache(
+    max_bytes=int(os.environ.get('REPORT_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    cache_dir=os.environ.get('REPORT_CACHE_DIR') or None,
+    max_disk_bytes=int(os.environ.get('REPORT_CACHE_DISK_BYTES', 512 * 1024 * 1024))
+)
+
+# PDF reports render in a pool of worker processes, off the event loop
+report_renderer = ReportRenderer(
+    max_workers=int(os.environ.get('REPORT_WORKERS', 2)),
+    timeout=float(os.environ.get('REPORT_TIMEOUT', 60.0))
+)
+
+# Micro-batches feature rows from all concurrent callers into one model call
+inference = InferenceScheduler(
+    predict_fn=predict_with_serving_model,
+    max_batch_size=int(os.environ.get('INFERENCE_MAX_BATCH', 64)),
+    max_wait=float(os.environ.get('INFERENCE_MAX_WAIT_MS', 2.0)) / 1000
+)
+
+# Shadow work is skipped whenever rows are waiting for the primary model
+shadow = ShadowEvaluator(
+    candidate_name=SHADOW_MODEL,
+    candidate_fn=predict_with_shadow_model,
+    fraction=float(os.environ.get('SHADOW_FRACTION', 0.1)),
+    max_pending=int(os.environ.get('SHADOW_MAX_PENDING_ROWS', 256)),
+    busy=lambda: inference.pending_rows > 0
+) if SHADOW_MODEL else None
+
+# Feature rows of recently scored windows, labelled later through POST /feedback
+window_log = WindowLog(max_windows=int(os.environ.get('FEEDBACK_WINDOW_LOG', 4096)))
+
+async def promote_online_model(name, path):
+    """Load a new online snapshot through the registry, like any reloaded model"""
+    registry.register(name, path)
+    await registry.reload(name)
+
+# Incrementally trained on confirmed labels; serve it with SERVING_MODEL=online_sgd
+# or compare it first with SHADOW_MODEL=online_sgd
+ONLINE_MODEL = os.environ.get('ONLINE_MODEL', 'online_sgd')
+online_learner = OnlineLearner(
+    name=ONLINE_MODEL,
+    save_dir=os.environ.get('ONLINE_MODEL_DIR', 'models'),
+    promote=promote_online_model,
+    batch_size=int(os.environ.get('ONLINE_BATCH_SIZE', 32)),
+    max_wait=float(os.environ.get('ONLINE_MAX_WAIT', 30.0)),
+    snapshot_every=int(os.environ.get('ONLINE_SNAPSHOT_EVERY', 1)),
+    busy=lambda: inference.pending_rows > 0
+)
+
+# One producer per /stream-signal channel, shared by all subscribers
+stream_hub = StreamHub(
+    queue_size=int(os.environ.get('STREAM_QUEUE_SIZE', 256)),
+    idle_timeout=float(os.environ.get('STREAM_IDLE_TIMEOUT', 5.0))
+)
+
+MAX_BATCH_SIGNALS = 256
+
+# Samples per sliding prediction window in /stream-signal
+STREAM_WINDOW = 100
+MAX_STREAM_FRAME_SIZE = 12000
+MAX_STREAM_SAMPLE_RATE = 48000
+
+# Largest prediction window accepted on /ws/ingest (10 s at 48 kHz)
+MAX_INGEST_WINDOW = 480000
+
+# /predict/recording featurizes and scores about this many window samples at a time
+RECORDING_CHUNK_SAMPLES = int(os.environ.get('RECORDING_CHUNK_SAMPLES', 1_000_000))
 
-# Initialize report generator
-report_gen = ReportGenerator()
+def recording_chunk_windows(window: int) -> int:
+    """Windows per /predict/recording chunk, so a chunk holds ~RECORDING_CHUNK_SAMPLES samples"""
+    return max(1, RECORDING_CHUNK_SAMPLES // window)
+
+# Recordings with more windows than this are refused with 413
+MAX_RECORDING_WINDOWS = int(os.environ.get('MAX_RECORDING_WINDOWS', 1_000_000))
 
 class SignalData(BaseModel):
     signal: List[float]
     sampling_rate: int = 12000
 
-def extract_features(signal):
-    """Extract features in EXACT same order as training"""
-    signal = np.array(signal)
-    
-    if len(signal) < 100:
-        raise ValueError("Signal too short")
-    
-    # Time domain features
-    mean = np.mean(signal)
-    std = np.std(signal)
-    rms = np.sqrt(np.mean(signal**2))
-    peak = np.max(np.abs(signal))
-    peak_to_peak = np.ptp(signal)
-    crest_factor = peak / rms if rms > 0 else 0
-    skewness = stats.skew(signal)
-    kurtosis = stats.kurtosis(signal)
-    
-    sqrt_abs_signal = np.sqrt(np.abs(signal))
-    sqrt_abs_mean = np.mean(sqrt_abs_signal)
-    clearance_factor = peak / (sqrt_abs_mean**2) if sqrt_abs_mean > 0 else 0
-    
-    abs_mean = np.mean(np.abs(signal))
-    shape_factor = rms / abs_mean if abs_mean > 0 else 0
-    impulse_factor = peak / abs_mean if abs_mean > 0 else 0
-    
-    # Frequency domain features
-    freqs, psd = welch(signal, fs=12000, nperseg=min(1024, len(signal)))
-    freq_mean = np.sum(freqs * psd) / np.sum(psd) if np.sum(psd) > 0 else 0
-    freq_std = np.sqrt(np.sum(((freqs - freq_mean)**2) * psd) / np.sum(psd)) if np.sum(psd) > 0 else 0
-    freq_peak = freqs[np.argmax(psd)]
-    
-    features_dict = {
-        'mean': float(mean),
-        'std': float(std),
-        'rms': float(rms),
-        'peak': float(peak),
-        'peak_to_peak': float(peak_to_peak),
-        'crest_factor': float(crest_factor),
-        'skewness': float(skewness),
-        'kurtosis': float(kurtosis),
-        'clearance_factor': float(clearance_factor),
-        'shape_factor': float(shape_factor),
-        'impulse_factor': float(impulse_factor),
-        'freq_mean': float(freq_mean),
-        'freq_std': float(freq_std),
-        'freq_peak': float(freq_peak)
-    }
+class BatchSignalData(BaseModel):
+    signals: List[SignalData] = Field(..., min_length=1, max_length=MAX_BATCH_SIGNALS)
+
+class WindowLabel(BaseModel):
+    window_id: str
+    label: str
+
+MAX_FEEDBACK_LABELS = 1024
+
+def predictions_from_proba(probabilities, class_names):
+    """Turn a predict_proba matrix into (prediction, confidence, probabilities) rows"""
+    best = np.argmax(probabilities, axis=1)
+    class_names = class_names.tolist()  # plain str/int labels for JSON
     
-    return features_dict
+    return [
+        (
+            class_names[idx],
+            float(probs[idx]),
+            {name: float(prob) for name, prob in zip(class_names, probs)}
+        )
+        for idx, probs in zip(best, probabilities)
+    ]
 
-def load_real_signal_segment(fault_type: str):
-    """Load a real segment from CWRU dataset"""
-    data_dir = '../data/cwru_dataset'
+async def predict_rows(feature_matrix, version, shadow_sample: bool = False):
+    """
+    Score feature rows with serving model `version` through the micro-batching
+    inference scheduler. With shadow_sample, the rows may also be scored by the
+    shadow model afterwards.
+    """
+    probabilities, class_names = await inference.predict_proba(feature_matrix, version)
+    rows = predictions_from_proba(probabilities, class_names)
     
-    file_mapping = {
-        'normal': 'normal_0.mat',
-        'fault/ball': 'ball_007_0.mat',
-        'fault/inner_race': 'inner_007_0.mat',
-        'fault/outer_race': 'outer_007_0.mat'
-    }
+    if shadow_sample and shadow is not None:
+        shadow.submit(feature_matrix, [row[0] for row in rows], class_names.tolist())
     
-    if fault_type not in file_mapping:
+    return rows
+
+CWRU_DATA_DIR = '../data/cwru_dataset'
+
+CWRU_FILES = {
+    'normal': 'normal_0.mat',
+    'fault/ball': 'ball_007_0.mat',
+    'fault/inner_race': 'inner_007_0.mat',
+    'fault/outer_race': 'outer_007_0.mat'
+}
+
+# Decoded recordings are shared across requests as memory-mapped .npy files
+recording_cache = RecordingCache(
+    cache_dir=os.environ.get('CWRU_CACHE_DIR', os.path.join(CWRU_DATA_DIR, '.cache')),
+    max_bytes=int(os.environ.get('CWRU_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+)
+
+def load_real_signal_array(fault_type: str, start_idx: int = 10000, length: int = 2400):
+    """Zero-copy view of a real segment from the CWRU dataset"""
+    if fault_type not in CWRU_FILES:
         return None
     
-    file_path = os.path.join(data_dir, file_mapping[fault_type])
+    file_path = os.path.join(CWRU_DATA_DIR, CWRU_FILES[fault_type])
     
     if not os.path.exists(file_path):
         return None
     
     try:
-        mat_data = loadmat(file_path)
-        de_keys = [key for key in mat_data.keys() if 'DE_time' in key]
-        
-        if de_keys:
-            full_signal = mat_data[de_keys[0]].flatten()
-            start_idx = 10000
-            segment = full_signal[start_idx:start_idx+2400]
-            return segment.tolist()
+        return recording_cache.get_segment(file_path, start_idx, length)
     
     except Exception as e:
         print(f"Error loading {file_path}: {e}")
         return None
+
+def load_real_signal_segment(fault_type: str):
+    """Load a real segment from CWRU dataset"""
+    segment = load_real_signal_array(fault_type)
     
-    return None
+    return segment.tolist() if segment is not None else None
 
 @app.get("/")
 def root():
     return {
         "message": "Vibration Fault Detection API - Real CWRU Model", 
         "status": "active",
-        "model_classes": model.classes_.tolist()
+        "model_classes": serving_model().model.classes_.tolist()
     }
 
 @app.get("/health")
 def health_check():
+    version = serving_model()
     return {
         "status": "healthy", 
         "model": "Random Forest (Real CWRU Data)", 
         "version": "2.1",
-        "features_expected": model.n_features_in_
+        "backend": type(version.model).__name__,
+        "model_version": version.version,
+        "features_expected": version.model.n_features_in_
     }
 
-@app.post("/predict")
-def predict_fault(data: SignalData):
+@app.post("/predict", openapi_extra=signal_body_openapi(SignalData))
+async def predict_fault(request: Request):
+    """
+    Predict the fault class of one signal.
+    Accepts a JSON SignalData body, raw little-endian float32/float64 samples
+    (application/octet-stream) or a .npy array.
+    """
+    signal, _ = await read_signal_body(request, SignalData)
+    
     try:
-        if len(data.signal) < 100:
+        if len(signal) < 100:
             raise HTTPException(status_code=400, detail="Signal too short (minimum 100 samples)")
         
+        # One model version for the whole request, even across a hot swap
+        version = serving_model()
+        
         # Extract features
-        features_dict = extract_features(data.signal)
+        features_dict = await run_in_threadpool(extract_features, signal, FEATURE_FS, serving_features(version))
         feature_array = np.array(list(features_dict.values())).reshape(1, -1)
         
-        # Predict
-        prediction = model.predict(feature_array)[0]
-        probabilities = model.predict_proba(feature_array)[0]
-        
-        # Map to class names
-        class_names = model.classes_
-        prob_dict = {name: float(prob) for name, prob in zip(class_names, probabilities)}
+        # Predict (batched with concurrent callers)
+        prediction, confidence, prob_dict = (await predict_rows(feature_array, version, shadow_sample=True))[0]
+        window_id = window_log.add(list(features_dict), feature_array)[0]
         
         return {
+            "window_id": window_id,
             "prediction": prediction,
-            "confidence": float(max(probabilities)),
+            "confidence": confidence,
             "probabilities": prob_dict,
             "features": features_dict,
-            "signal": data.signal  # Add the signal to the response
+            "signal": signal.tolist()  # Add the signal to the response
         }
     
     except Exception as e:
         print(f"Error in prediction: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict/batch")
+async def predict_fault_batch(data: BatchSignalData):
+    """
+    Score many signals with one feature pass and one predict_proba call.
+    Results come back in request order; invalid items carry an error instead.
+    """
+    results = [None] * len(data.signals)
+    valid = []
+    
+    for i, item in enumerate(data.signals):
+        if len(item.signal) < MIN_SIGNAL_LENGTH:
+            results[i] = {"index": i, "error": f"Signal too short (minimum {MIN_SIGNAL_LENGTH} samples)"}
+        else:
+            valid.append(i)
+    
+    if valid:
+        version = serving_model()
+        names = serving_features(version)
+        try:
+            feature_matrix = await run_in_threadpool(
+                extract_features_many, [data.signals[i].signal for i in valid], FEATURE_FS, names
+            )
+            rows = await predict_rows(feature_matrix, version)
+        except Exception as e:
+            print(f"Error in batch prediction: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+        
+        for i, features, (prediction, confidence, prob_dict) in zip(valid, feature_matrix, rows):
+            results[i] = {
+                "index": i,
+                "prediction": prediction,
+                "confidence": confidence,
+                "probabilities": prob_dict,
+                "features": features_to_dict(features, names),
+                "sampling_rate": data.signals[i].sampling_rate
+            }
+    
+    return {
+        "count": len(results),
+        "succeeded": len(valid),
+        "results": results
+    }
+
+@app.post("/predict/recording", openapi_extra=signal_body_openapi(SignalData))
+async def predict_recording(
+    request: Request,
+    window: int = Query(2400, ge=MIN_SIGNAL_LENGTH, le=MAX_INGEST_WINDOW),
+    hop: int = Query(1200, ge=1)
+):
+    """
+    Score a long recording window by window.
+    Windows start every `hop` samples and are strided views of the body, so
+    only about RECORDING_CHUNK_SAMPLES window samples are featurized at a
+    time. Consecutive windows with the same prediction are merged into one
+    segment, and per-class window counts are returned alongside.
+    """
+    signal, sampling_rate = await read_signal_body(request, SignalData)
+    
+    if len(signal) < window:
+        raise HTTPException(status_code=400, detail=f"Signal shorter than one window ({window} samples)")
+    
+    count = segment_count(len(signal), window, hop)
+    if count > MAX_RECORDING_WINDOWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{count} windows exceed the limit of {MAX_RECORDING_WINDOWS}; use a larger hop"
+        )
+    
+    version = serving_model()
+    names = serving_features(version)
+    segments, class_counts = [], {}
+    try:
+        for first, chunk in iter_segment_chunks(signal, window, hop, recording_chunk_windows(window)):
+            feature_matrix = await run_in_threadpool(
+                extract_features_batch, chunk, FEATURE_FS, WELCH_NPERSEG, names
+            )
+            for offset, (prediction, confidence, _) in enumerate(await predict_rows(feature_matrix, version)):
+                start = (first + offset) * hop
+                last = segments[-1] if segments else None
+                if last is not None and last["prediction"] == prediction:
+                    last["end"] = start + window
+                    last["windows"] += 1
+                    last["mean_confidence"] += (confidence - last["mean_confidence"]) / last["windows"]
+                    last["min_confidence"] = min(last["min_confidence"], confidence)
+                else:
+                    segments.append({
+                        "start": start,
+                        "end": start + window,
+                        "prediction": prediction,
+                        "windows": 1,
+                        "mean_confidence": confidence,
+                        "min_confidence": confidence
+                    })
+                class_counts[prediction] = class_counts.get(prediction, 0) + 1
+    except Exception as e:
+        print(f"Error in recording prediction: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "sampling_rate": sampling_rate,
+        "window": window,
+        "hop": hop,
+        "count": count,
+        "class_counts": class_counts,
+        "segments": segments
+    }
+
+def signal_spectrum(signal: np.ndarray, sampling_rate: int, max_freq: float, buckets: int):
+    """FFT envelope and Welch PSD up to max_freq from one Spectrum"""
+    spectrum = Spectrum(signal, sampling_rate)
+    freq, magnitude, x_max = spectrum.plot_envelope(max_freq, buckets)
+    shown = freq <= x_max
+    psd_freqs, psd = spectrum.welch
+    in_range = psd_freqs <= x_max
+    return {
+        "sampling_rate": sampling_rate,
+        "n_samples": len(signal),
+        "max_frequency": x_max,
+        "fft": {"frequencies": freq[shown].tolist(), "magnitude": magnitude[shown].tolist()},
+        "psd": {"frequencies": psd_freqs[in_range].tolist(), "density": psd[0, in_range].tolist()}
+    }
+
+@app.post("/spectrum", openapi_extra=signal_body_openapi(SignalData))
+async def get_signal_spectrum(
+    request: Request,
+    max_freq: float = Query(SPECTRUM_MAX_FREQ, gt=0, description="Highest frequency returned (Hz)"),
+    buckets: int = Query(512, ge=1, le=8192, description="Min/max pairs kept from the FFT")
+):
+    """
+    FFT magnitude (min/max reduced for charts) and Welch PSD of one signal.
+    Accepts the same bodies as /predict.
+    """
+    signal, sampling_rate = await read_signal_body(request, SignalData)
+    
+    if len(signal) < MIN_SIGNAL_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Signal too short (minimum {MIN_SIGNAL_LENGTH} samples)")
+    
+    return await run_in_threadpool(signal_spectrum, signal, sampling_rate, max_freq, buckets)
+
 @app.get("/example/{fault_type:path}")
 def get_example_signal(fault_type: str):
     """Load REAL example from CWRU dataset"""
@@ -184,48 +447,86 @@ def get_example_signal(fault_type: str):
     
     return {"signal": signal, "type": fault_type}
 
-@app.post("/diagnostic-report")
-async def generate_diagnostic_report(data: SignalData):
+def analyse_report_signal(signal: np.ndarray, sampling_rate: int, names):
+    """Features and the spectrum plot of a report, from one shared transform of the signal"""
+    spectrum = Spectrum(signal, FEATURE_FS)
+    features_dict = extract_features(signal, FEATURE_FS, names, spectrum=spectrum)
+    return features_dict, spectrum.at_rate(sampling_rate).plot_envelope()
+
+async def render_report(signal: np.ndarray, sampling_rate: int, version) -> bytes:
+    """Features, prediction from serving model `version` and rendered PDF for one signal"""
+    features_dict, spectrum_plot = await run_in_threadpool(
+        analyse_report_signal, signal, sampling_rate, serving_features(version)
+    )
+    feature_array = np.array(list(features_dict.values())).reshape(1, -1)
+    
+    # Get prediction from model
+    prediction, confidence, prob_dict = (await predict_rows(feature_array, version))[0]
+    
+    print(f"Generating report for prediction: {prediction} (confidence: {confidence:.2%})")
+    
+    # Generate PDF report in a worker process
+    return await report_renderer.render(
+        signal=signal,
+        sampling_rate=sampling_rate,
+        features=features_dict,
+        prediction=prediction,
+        confidence=confidence,
+        probabilities=prob_dict,
+        spectrum_plot=spectrum_plot
+    )
+
+async def render_report_cached(signal: np.ndarray, sampling_rate: int) -> bytes:
+    """Rendered PDF for one signal, through the content-addressed report cache"""
+    version = serving_model()
+    key = report_key(signal, sampling_rate, version.checksum)
+    pdf_bytes, _ = await report_cache.get_or_render(key, lambda: render_report(signal, sampling_rate, version))
+    return pdf_bytes
+
+# Queued report jobs; REPORT_JOB_CONCURRENCY caps the renders they use at once
+report_jobs = ReportJobQueue(
+    jobs_dir=os.environ.get('REPORT_JOBS_DIR', 'report_jobs'),
+    render=render_report_cached,
+    concurrency=int(os.environ.get('REPORT_JOB_CONCURRENCY', 1))
+)
+
+@app.on_event("startup")
+async def start_report_workers():
+    """Load the serving model, spawn the report workers and resume queued report jobs"""
+    await asyncio.to_thread(serving_model)
+    watch_interval = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+    if watch_interval > 0:
+        asyncio.get_running_loop().create_task(registry.watch(watch_interval))
+    await report_renderer.start()
+    await report_jobs.start()
+
+@app.on_event("shutdown")
+async def stop_report_workers():
+    await report_jobs.stop()
+    report_renderer.shutdown()
+
+@app.post("/diagnostic-report", openapi_extra=signal_body_openapi(SignalData))
+async def generate_diagnostic_report(request: Request):
     """
     Generate comprehensive PDF diagnostic report
-    Accepts signal data and returns PDF file
+    Accepts signal data (JSON, raw float or .npy body) and returns PDF file
     """
+    signal, sampling_rate = await read_signal_body(request, SignalData)
+    
     try:
         # Validate input
-        if len(data.signal) < 100:
+        if len(signal) < 100:
             raise HTTPException(
                 status_code=400, 
                 detail="Signal too short (minimum 100 samples required)"
             )
         
-        # Convert to numpy array
-        signal = np.array(data.signal)
-        
-        # Extract features
-        features_dict = extract_features(signal)
-        feature_array = np.array(list(features_dict.values())).reshape(1, -1)
-        
-        # Get prediction from model
-        prediction = model.predict(feature_array)[0]
-        probabilities = model.predict_proba(feature_array)[0]
-        confidence = float(max(probabilities))
-        
-        # Create probabilities dictionary
-        prob_dict = {
-            name: float(prob) 
-            for name, prob in zip(model.classes_, probabilities)
-        }
-        
-        print(f"Generating report for prediction: {prediction} (confidence: {confidence:.2%})")
-        
-        # Generate PDF report
-        pdf_bytes = report_gen.generate_pdf(
-            signal=signal,
-            sampling_rate=data.sampling_rate,
-            features=features_dict,
-            prediction=prediction,
-            confidence=confidence,
-            probabilities=prob_dict
+        # Identical signals share one cached (or in-flight) render; the key and
+        # the render use the same model version
+        version = serving_model()
+        key = report_key(signal, sampling_rate, version.checksum)
+        pdf_bytes, cache_status = await report_cache.get_or_render(
+            key, lambda: render_report(signal, sampling_rate, version)
         )
         
         # Create file buffer
@@ -242,13 +543,18 @@ async def generate_diagnostic_report(data: SignalData):
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Type": "application/pdf"
+                "Content-Type": "application/pdf",
+                "X-Report-Cache": cache_status
             }
         )
     
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
+    except ReportTimeout as e:
+        print(f"Report generation timed out: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
@@ -258,109 +564,349 @@ async def generate_diagnostic_report(data: SignalData):
             detail=f"Failed to generate report: {str(e)}"
         )
 
-@app.get("/stream-signal")
-async def stream_signal(mode: str = 'real'):
+@app.post("/reports", status_code=status.HTTP_202_ACCEPTED,
+          openapi_extra=signal_body_openapi(SignalData))
+async def submit_report_job(request: Request):
     """
-    Stream simulated real-time vibration data with predictions
+    Queue a PDF diagnostic report and return its job id immediately.
+    Poll GET /reports/{job_id} until the PDF is ready.
+    """
+    signal, sampling_rate = await read_signal_body(request, SignalData)
+    
+    if len(signal) < MIN_SIGNAL_LENGTH:
+        raise HTTPException(
+            status_code=400, 
+            detail="Signal too short (minimum 100 samples required)"
+        )
+    
+    job_id = await report_jobs.submit(signal, sampling_rate)
+    
+    return {
+        "id": job_id,
+        "status": "queued",
+        "status_url": f"/reports/{job_id}"
+    }
+
+@app.get("/reports/{job_id}")
+async def get_report_job(job_id: str):
+    """
+    Status of a report job while it is queued or running (202),
+    then the PDF once it is done
+    """
+    job = await report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown report job {job_id}")
+    
+    if job["status"] == "done":
+        try:
+            with open(report_jobs.pdf_path(job_id), 'rb') as f:
+                pdf_bytes = f.read()
+        except FileNotFoundError:
+            raise HTTPException(status_code=410, detail=f"Report {job_id} is no longer available")
+        
+        return Response(
+            content=pdf_bytes,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename=bearing_diagnostic_report_{job_id}.pdf"}
+        )
+    
+    status_code = status.HTTP_200_OK if job["status"] == "failed" else status.HTTP_202_ACCEPTED
+    return JSONResponse(status_code=status_code, content=job)
+
+async def generate_stream_events(mode: str, frame_size: int, encoding: str, sample_rate: float):
+    """
+    Simulated real-time vibration events with predictions for one stream channel
     mode: 'real' (CWRU data) or 'random' (generated noise)
     """
-    async def generate():
-        import json
-        import random
+    import random
+    
+    framed = frame_size > 1 or encoding != 'json'
+    
+    # Load real segments for simulation
+    scenarios = ['normal', 'fault/ball', 'fault/inner_race', 'fault/outer_race']
+    loop = asyncio.get_running_loop()
+    next_frame_at = loop.time()
+    
+    async def prediction_event(all_features, scenario):
+        try:
+            version = serving_model()
+            features = {name: all_features[name] for name in serving_features(version)}
+            feature_array = np.array(list(features.values())).reshape(1, -1)
+            prediction, confidence, prob_dict = (await predict_rows(feature_array, version, shadow_sample=True))[0]
+            window_id = window_log.add(list(features), feature_array)[0]
+            
+            return format_sse({
+                "type": "prediction",
+                "window_id": window_id,
+                "prediction": prediction,
+                "confidence": confidence,
+                "probabilities": prob_dict,
+                "features": features,
+                "scenario": scenario # For debugging/verification
+            }, event="prediction")
+        except Exception as e:
+            print(f"Stream prediction error: {e}")
+            return None
+    
+    # Predictions run as a task beside the pacing loop, one at a time: events
+    # sent while one is in flight get no prediction of their own, so sample
+    # timing never waits on inference and stale windows are never queued
+    pending = None
+    
+    while True:
+        if mode == 'real':
+            # Pick a random scenario
+            scenario = random.choice(scenarios)
+            # Stream 500 points per scenario switch (at least one frame)
+            n_points = max(500, frame_size)
+            signal_segment = await run_in_threadpool(load_real_signal_array, scenario, 10000, n_points)
+            
+            if signal_segment is None:
+                await asyncio.sleep(1.0)
+                continue
         
-        # Load real segments for simulation
-        scenarios = ['normal', 'fault/ball', 'fault/inner_race', 'fault/outer_race']
+        else: # Random mode
+            # Simulate a "scenario" for random mode too (e.g. just noise vs high amplitude noise)
+            is_noisy = random.random() > 0.5
+            scenario = "simulated_noise" if not is_noisy else "simulated_fault"
+            
+            # Generate the whole block of random noise/sine waves at once
+            n_points = max(200, frame_size)
+            t = time.time() + np.arange(n_points) / sample_rate
+            if is_noisy:
+                signal_segment = np.sin(t * 10) * 0.5 + np.random.normal(0, 0.2, n_points)
+            else:
+                signal_segment = np.random.normal(0, 0.05, n_points)
+        
+        tracker = SlidingWindowFeatures(window=STREAM_WINDOW)
         
+        for start in range(0, len(signal_segment), frame_size):
+            frame = np.asarray(signal_segment[start:start + frame_size], dtype=np.float64)
+            t0 = time.time()
+            
+            if framed:
+                yield encode_frame(frame, t0, sample_rate, encoding)
+            else:
+                yield format_sse({"timestamp": t0, "amplitude": float(frame[0])})
+            
+            tracker.extend(frame)
+            if pending is not None and pending.done():
+                event = pending.result()
+                pending = None
+                if event is not None:
+                    yield event
+            if pending is None and tracker.ready:
+                # Features of the last STREAM_WINDOW points now, scored off the loop
+                pending = asyncio.create_task(prediction_event(tracker.features(), scenario))
+            
+            # Pace against a deadline so encoding time does not slow the stream
+            next_frame_at = max(next_frame_at + len(frame) / sample_rate, loop.time() - 1.0)
+            await asyncio.sleep(max(0.0, next_frame_at - loop.time()))
+
+@app.get("/stream-signal")
+async def stream_signal(
+    mode: str = 'real',
+    frame_size: int = Query(1, ge=1, le=MAX_STREAM_FRAME_SIZE),
+    encoding: str = Query('json', pattern='^(json|base64)$'),
+    sample_rate: float = Query(20.0, gt=0, le=MAX_STREAM_SAMPLE_RATE)
+):
+    """
+    Stream simulated real-time vibration data with predictions
+    mode: 'real' (CWRU data) or 'random' (generated noise)
+    frame_size: samples per event. 1 keeps the per-sample `data:` events;
+        larger values send `frame` events with a start timestamp and rate
+    encoding: 'json' amplitudes or 'base64' little-endian float32 frames
+    sample_rate: playback rate in samples per second (20 = one sample per 50 ms)
+    
+    Subscribers with the same parameters share one producer through the
+    stream hub, so samples, features and predictions are computed once.
+    """
+    key = ('real' if mode == 'real' else 'random', frame_size, encoding, sample_rate)
+    events = stream_hub.subscribe(key, lambda: generate_stream_events(*key))
+    
+    return StreamingResponse(events, media_type="text/event-stream")
+
+@app.get("/models")
+def list_models():
+    """Registered model artifacts with their active version, load time and memory"""
+    return {"serving": SERVING_MODEL, "models": registry.list_models()}
+
+@app.post("/models/{name}/reload")
+async def reload_model(name: str, force: bool = False):
+    """
+    Load a new version of a model file in the background and swap it in.
+    Requests already running finish on the previous version.
+    """
+    if name not in registry.paths:
+        raise HTTPException(status_code=404, detail=f"Unknown model {name}")
+    
+    try:
+        return await registry.reload(name, force=force)
+    except Exception as e:
+        print(f"Model reload error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to load {name}: {str(e)}")
+
+@app.get("/metrics/inference")
+def inference_metrics():
+    """Micro-batching scheduler counters with batch-size and queue-wait histograms"""
+    return inference.stats()
+
+@app.get("/metrics/reports")
+async def report_metrics():
+    """Report worker pool, report cache and job queue counters"""
+    return {
+        **report_renderer.stats(),
+        "cache": report_cache.stats(),
+        "jobs": await report_jobs.stats()
+    }
+
+@app.get("/metrics/shadow")
+def shadow_metrics():
+    """Shadow model agreement, confusion matrix and per-model latency histograms"""
+    if shadow is None:
+        return {"enabled": False}
+    return {"enabled": True, **shadow.stats()}
+
+@app.post("/feedback")
+async def submit_feedback(labels: Union[WindowLabel, List[WindowLabel]]):
+    """
+    Confirm the true class of recently scored windows, by the window_id
+    returned from /predict, /stream-signal or /ws/ingest. Accepted rows train
+    the online model in the background.
+    """
+    labels = labels if isinstance(labels, list) else [labels]
+    if not 1 <= len(labels) <= MAX_FEEDBACK_LABELS:
+        raise HTTPException(status_code=400, detail=f"Send 1 to {MAX_FEEDBACK_LABELS} labels")
+    
+    classes = [str(c) for c in serving_model().model.classes_]
+    unknown = [item.label for item in labels if item.label not in classes]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown labels {sorted(set(unknown))}, expected one of {classes}")
+    
+    accepted, expired, rejected = 0, [], []
+    for item in labels:
+        window = window_log.pop(item.window_id)
+        if window is None:
+            expired.append(item.window_id)
+        elif online_learner.submit(window[0], window[1], item.label, classes):
+            accepted += 1
+        else:
+            rejected.append(item.window_id)
+    
+    if not accepted and expired and not rejected:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired windows {expired}")
+    
+    return {"accepted": accepted, "expired": expired, "rejected": rejected,
+            "pending": online_learner.stats()["pending_rows"]}
+
+@app.get("/metrics/online")
+def online_metrics():
+    """Online model label, update and snapshot counters with prequential accuracy"""
+    return {**online_learner.stats(), "window_log": len(window_log)}
+
+@app.get("/stream-signal/channels")
+def stream_channels():
+    """Active /stream-signal channels with subscriber and event counters"""
+    return stream_hub.stats()
+
+async def _predict_windows(windows):
+    """Window ids, features and predictions for a list of equal-length windows"""
+    version = serving_model()
+    names = serving_features(version)
+    feature_matrix = await run_in_threadpool(extract_features_many, windows, FEATURE_FS, names)
+    rows = await predict_rows(feature_matrix, version)
+    window_ids = window_log.add(names, feature_matrix)
+    
+    return [
+        (window_id, features_to_dict(features, names), prediction, confidence, prob_dict)
+        for window_id, features, (prediction, confidence, prob_dict) in zip(window_ids, feature_matrix, rows)
+    ]
+
+@app.websocket("/ws/ingest/{asset_id}")
+async def ingest_sensor_stream(
+    websocket: WebSocket,
+    asset_id: str,
+    window: int = 2400,
+    hop: int = 1200,
+    sampling_rate: int = 12000,
+    dtype: str = 'float32'
+):
+    """
+    Live sensor ingestion for one asset.
+    The client sends binary frames of little-endian samples (dtype float32 or
+    float64) or JSON text frames {"signal": [...]}. Once `window` samples have
+    arrived the server pushes a prediction over the latest window, then one
+    every `hop` samples.
+    """
+    if not (MIN_SIGNAL_LENGTH <= window <= MAX_INGEST_WINDOW and 1 <= hop <= window
+            and sampling_rate > 0 and dtype in RAW_SAMPLE_DTYPES):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    
+    ring = SampleRing(window)
+    next_prediction_at = window
+    sample_dtype = RAW_SAMPLE_DTYPES[dtype]
+    
+    try:
         while True:
-            if mode == 'real':
-                # Pick a random scenario
-                scenario = random.choice(scenarios)
-                signal_segment = load_real_signal_segment(scenario)
+            message = await websocket.receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            
+            # Decode the frame
+            try:
+                if message.get('bytes') is not None:
+                    payload = message['bytes']
+                    if len(payload) % sample_dtype.itemsize:
+                        raise ValueError(f"Frame length is not a multiple of {sample_dtype.itemsize} bytes")
+                    samples = np.frombuffer(payload, dtype=sample_dtype)
+                else:
+                    samples = np.asarray(json.loads(message.get('text') or '{}').get('signal', []), dtype=np.float64)
                 
-                if signal_segment is None:
-                    continue
-                    
-                # Stream this segment point by point
-                buffer = []
-                for val in signal_segment[:500]: # Stream 500 points per scenario switch
-                    data_point = {
-                        "timestamp": time.time(),
-                        "amplitude": float(val)
-                    }
-                    yield f"data: {json.dumps(data_point)}\n\n"
-                    
-                    # Add to buffer for prediction
-                    buffer.append(val)
-                    if len(buffer) >= 100:
-                        # Run prediction on buffer
-                        try:
-                            features = extract_features(buffer[-100:]) # Last 100 points
-                            feature_array = np.array(list(features.values())).reshape(1, -1)
-                            prediction = model.predict(feature_array)[0]
-                            confidence = float(max(model.predict_proba(feature_array)[0]))
-                            
-                            # Map to class names
-                            class_names = model.classes_
-                            prob_dict = {name: float(prob) for name, prob in zip(class_names, model.predict_proba(feature_array)[0])}
-                            
-                            pred_event = {
-                                "type": "prediction",
-                                "prediction": prediction,
-                                "confidence": confidence,
-                                "probabilities": prob_dict,
-                                "features": features,
-                                "scenario": scenario # For debugging/verification
-                            }
-                            yield f"event: prediction\ndata: {json.dumps(pred_event)}\n\n"
-                        except Exception as e:
-                            print(f"Stream prediction error: {e}")
-                    
-                    await asyncio.sleep(0.05) # 20Hz streaming rate for visualization
+                if samples.ndim != 1 or not np.isfinite(samples).all():
+                    raise ValueError("Frame must be a flat array of finite samples")
+            except (ValueError, TypeError, AttributeError) as e:
+                await websocket.send_json({"type": "error", "asset_id": asset_id, "detail": str(e)})
+                continue
             
-            else: # Random mode
-                # Generate random noise/sine waves
-                buffer = []
-                # Simulate a "scenario" for random mode too (e.g. just noise vs high amplitude noise)
-                is_noisy = random.random() > 0.5
-                scenario = "simulated_noise" if not is_noisy else "simulated_fault"
+            # Append up to each hop boundary and snapshot the window there
+            windows, sample_indices = [], []
+            pos = 0
+            while pos < len(samples):
+                take = min(next_prediction_at - ring.total, len(samples) - pos)
+                ring.extend(samples[pos:pos + take])
+                pos += take
                 
-                for i in range(200): # Stream 200 points
-                    t = time.time()
-                    if is_noisy:
-                        val = np.sin(t * 10) * 0.5 + np.random.normal(0, 0.2)
-                    else:
-                        val = np.random.normal(0, 0.05)
-                        
-                    data_point = {
-                        "timestamp": t,
-                        "amplitude": float(val)
-                    }
-                    yield f"data: {json.dumps(data_point)}\n\n"
-                    
-                    buffer.append(val)
-                    if len(buffer) >= 100:
-                        try:
-                            features = extract_features(buffer[-100:])
-                            feature_array = np.array(list(features.values())).reshape(1, -1)
-                            prediction = model.predict(feature_array)[0]
-                            confidence = float(max(model.predict_proba(feature_array)[0]))
-                            
-                            class_names = model.classes_
-                            prob_dict = {name: float(prob) for name, prob in zip(class_names, model.predict_proba(feature_array)[0])}
-                            
-                            pred_event = {
-                                "type": "prediction",
-                                "prediction": prediction,
-                                "confidence": confidence,
-                                "probabilities": prob_dict,
-                                "features": features,
-                                "scenario": scenario
-                            }
-                            yield f"event: prediction\ndata: {json.dumps(pred_event)}\n\n"
-                        except Exception as e:
-                            pass
-                            
-                    await asyncio.sleep(0.05)
-
-    return StreamingResponse(generate(), media_type="text/event-stream")
-
+                if ring.total == next_prediction_at:
+                    windows.append(ring.values())
+                    sample_indices.append(ring.total)
+                    next_prediction_at += hop
+            
+            if not windows:
+                continue
+            
+            try:
+                results = await _predict_windows(windows)
+            except Exception as e:
+                print(f"Ingest prediction error ({asset_id}): {e}")
+                await websocket.send_json({"type": "error", "asset_id": asset_id, "detail": str(e)})
+                continue
+            
+            for sample_index, (window_id, features, prediction, confidence, prob_dict) in zip(sample_indices, results):
+                await websocket.send_json({
+                    "type": "prediction",
+                    "window_id": window_id,
+                    "asset_id": asset_id,
+                    "sample_index": sample_index,
+                    "sampling_rate": sampling_rate,
+                    "timestamp": time.time(),
+                    "prediction": prediction,
+                    "confidence": confidence,
+                    "probabilities": prob_dict,
+                    "features": features
+                })
+    
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,228 @@
+# backend/app/model_registry.py
+import asyncio
+import glob
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+import joblib
+import numpy as np
+from typing import Dict, List, Optional
+
+from app.compiled_forest import CompiledForest, compile_model
+
+# Probe rows used to warm up a freshly loaded estimator
+WARMUP_ROWS = 64
+# Superseded versions kept in each model's history
+HISTORY_LENGTH = 5
+# Pickled artifacts and compact forests (CompiledForest.save_compact)
+MODEL_PATTERNS = ('*.pkl', '*.npz')
+
+
+def _deep_nbytes(obj, seen=None) -> int:
+    """Approximate memory held by an object graph (NumPy buffers included)"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        size = obj.nbytes
+        if obj.dtype == object:
+            size += sum(_deep_nbytes(item, seen) for item in obj.ravel())
+        return size
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            _deep_nbytes(k, seen) + _deep_nbytes(v, seen) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(_deep_nbytes(item, seen) for item in obj)
+
+    # Estimators keep their state in __dict__; Cython trees expose it via __getstate__
+    try:
+        state = obj.__getstate__()
+    except Exception:
+        state = getattr(obj, '__dict__', None)
+    return sys.getsizeof(obj) + (_deep_nbytes(state, seen) if state is not None else 0)
+
+
+class ModelVersion:
+    """One loaded version of a model artifact and its load statistics"""
+
+    def __init__(self, name: str, version: int, path: str, checksum: str, mtime: float,
+                 model, load_ms: float, warmup_ms: Optional[float], nbytes: int):
+        self.name = name
+        self.version = version
+        self.path = path
+        self.checksum = checksum
+        self.mtime = mtime
+        self.model = model
+        self.load_ms = load_ms
+        self.warmup_ms = warmup_ms
+        self.nbytes = nbytes
+        self.loaded_at = time.time()
+
+    def describe(self) -> Dict:
+        return {
+            "version": self.version,
+            "checksum": self.checksum,
+            "path": self.path,
+            "type": type(self.model).__name__,
+            "loaded_at": self.loaded_at,
+            "load_ms": round(self.load_ms, 3),
+            "warmup_ms": None if self.warmup_ms is None else round(self.warmup_ms, 3),
+            "memory_bytes": self.nbytes
+        }
+
+
+class ModelRegistry:
+    """
+    Named model artifacts (estimators, scalers, label encoders) found in a
+    set of directories, loaded lazily and replaceable without a restart.
+
+    `current(name)` returns the active ModelVersion, loading it on first
+    use. `reload(name)` reads the artifact again in a background thread,
+    verifies its checksum, warms it up and then swaps it in with a single
+    assignment. Callers that already hold the old ModelVersion keep using
+    it until they finish, so in-flight requests are never mixed across
+    versions. Estimators are served through `compile_model` with `backend`;
+    compact .npz forests are always served compiled.
+    """
+
+    def __init__(self, model_dirs: List[str], backend: str = 'sklearn'):
+        self.backend = backend
+        self.paths: Dict[str, str] = {}
+        self._active: Dict[str, ModelVersion] = {}
+        self._history: Dict[str, List[Dict]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        for model_dir in model_dirs:
+            for pattern in MODEL_PATTERNS:
+                for path in sorted(glob.glob(os.path.join(model_dir, pattern))):
+                    name = os.path.splitext(os.path.basename(path))[0]
+                    self.paths.setdefault(name, os.path.abspath(path))
+
+    def register(self, name: str, path: str):
+        """Make an artifact created after start-up loadable under `name`"""
+        with self._lock:
+            self.paths.setdefault(name, os.path.abspath(path))
+
+    def _name_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def _path(self, name: str) -> str:
+        if name not in self.paths:
+            raise KeyError(f"Unknown model {name!r}")
+        return self.paths[name]
+
+    @staticmethod
+    def _warm_up(model) -> Optional[float]:
+        """Run a probe batch through the model; returns its latency in ms"""
+        n_features = getattr(model, 'n_features_in_', None)
+        if n_features is None:
+            return None
+        probe = np.random.default_rng(0).normal(size=(WARMUP_ROWS, n_features))
+
+        start = time.perf_counter()
+        if hasattr(model, 'predict_proba'):
+            model.predict_proba(probe[:1])
+            model.predict_proba(probe)
+        elif hasattr(model, 'transform'):
+            model.transform(probe)
+        else:
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    def _load(self, name: str, force: bool = False) -> Optional[ModelVersion]:
+        """Load `name` from disk and make it active; None if the file is unchanged"""
+        path = self._path(name)
+        with self._name_lock(name):
+            st = os.stat(path)
+            with open(path, 'rb') as f:
+                payload = f.read()
+            checksum = hashlib.sha256(payload).hexdigest()[:16]
+
+            active = self._active.get(name)
+            if active is not None and active.checksum == checksum and not force:
+                active.mtime = st.st_mtime
+                return None
+
+            start = time.perf_counter()
+            if path.endswith('.npz'):
+                model = CompiledForest.load_compact(io.BytesIO(payload))
+            else:
+                model = joblib.load(io.BytesIO(payload))
+            if hasattr(model, 'estimators_'):
+                model = compile_model(model, backend=self.backend)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            loaded = ModelVersion(
+                name=name,
+                version=(active.version + 1) if active is not None else 1,
+                path=path,
+                checksum=checksum,
+                mtime=st.st_mtime,
+                model=model,
+                load_ms=load_ms,
+                warmup_ms=self._warm_up(model),
+                nbytes=_deep_nbytes(model)
+            )
+
+            # Atomic swap: readers see either the old or the new version
+            self._active[name] = loaded
+            if active is not None:
+                history = self._history.setdefault(name, [])
+                # Keep only the description so the old model can be freed
+                history.insert(0, active.describe())
+                del history[HISTORY_LENGTH:]
+
+        print(f"✅ Model {name} v{loaded.version} ({checksum}) loaded in {load_ms:.1f} ms, "
+              f"warm-up {loaded.warmup_ms or 0:.2f} ms, ~{loaded.nbytes / 1024:.0f} KB")
+        return loaded
+
+    def current(self, name: str) -> ModelVersion:
+        """Active version of `name`, loaded on first use"""
+        active = self._active.get(name)
+        if active is None:
+            self._load(name)
+            active = self._active[name]
+        return active
+
+    async def reload(self, name: str, force: bool = False) -> Dict:
+        """Load the artifact in the background and swap it in if it changed"""
+        loaded = await asyncio.to_thread(self._load, name, force)
+        return {"swapped": loaded is not None, **self.describe(name)}
+
+    async def watch(self, interval: float):
+        """Reload models whose files changed, checking every `interval` seconds"""
+        while True:
+            await asyncio.sleep(interval)
+            for name, active in list(self._active.items()):
+                try:
+                    if os.stat(active.path).st_mtime != active.mtime:
+                        await self.reload(name)
+                except Exception as e:
+                    print(f"⚠️  Reload of {name} failed, keeping v{active.version}: {e}")
+
+    def describe(self, name: str) -> Dict:
+        """Path, active version and history of one model"""
+        path = self._path(name)
+        active = self._active.get(name)
+        return {
+            "name": name,
+            "path": path,
+            "loaded": active is not None,
+            "active": active.describe() if active is not None else None,
+            "history": list(self._history.get(name, []))
+        }
+
+    def list_models(self) -> List[Dict]:
+        """Every registered model, loaded or not"""
+        return [self.describe(name) for name in sorted(self.paths)]
@@ -0,0 +1,233 @@
+# backend/app/online_learning.py
+import asyncio
+import copy
+import os
+import threading
+import time
+import uuid
+import joblib
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+
+class WindowLog:
+    """
+    Feature rows of recently scored windows, kept so they can be labelled later.
+
+    Every scored window gets an id that is returned to the client; the
+    newest `max_windows` rows are kept. A window is handed out once, so the
+    same confirmation cannot train the model twice.
+    """
+
+    def __init__(self, max_windows: int = 4096):
+        self.max_windows = max_windows
+        self._rows: "OrderedDict[str, Tuple[Tuple[str, ...], np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, names: Sequence[str], rows: np.ndarray) -> List[str]:
+        """Remember each feature row; returns their window ids"""
+        names = tuple(names)
+        ids = [uuid.uuid4().hex[:16] for _ in range(len(rows))]
+        with self._lock:
+            for window_id, row in zip(ids, np.atleast_2d(rows)):
+                self._rows[window_id] = (names, np.array(row, dtype=np.float64))
+            while len(self._rows) > self.max_windows:
+                self._rows.popitem(last=False)
+        return ids
+
+    def pop(self, window_id: str) -> Optional[Tuple[Tuple[str, ...], np.ndarray]]:
+        """(feature names, row) of a window, removed from the log; None if unknown or expired"""
+        with self._lock:
+            return self._rows.pop(window_id, None)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class OnlineLearner:
+    """
+    Incrementally trained classifier fed by confirmed window labels.
+
+    Labelled rows are queued by `submit`; a background task trains on them
+    in batches of `batch_size` (or whatever arrived within `max_wait`
+    seconds) with StandardScaler and SGDClassifier `partial_fit`, on its own
+    thread. Each batch is scored before it is learned from, giving a
+    prequential accuracy. While `busy()` reports queued inference rows the
+    update waits, briefly, so training does not compete with predictions.
+
+    Every `snapshot_every` updates the scaler and classifier are written as
+    one pipeline to `<save_dir>/<name>.pkl` and handed to `promote(name,
+    path)`, which loads it like any other model artifact. An existing
+    snapshot at that path is resumed from on start-up.
+    """
+
+    def __init__(self, name: str, save_dir: str,
+                 promote: Optional[Callable[[str, str], "asyncio.Future"]] = None,
+                 batch_size: int = 32, max_wait: float = 30.0, snapshot_every: int = 1,
+                 busy: Optional[Callable[[], bool]] = None, max_busy_wait: float = 1.0):
+        self.name = name
+        self.save_dir = save_dir
+        self.promote = promote
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.snapshot_every = snapshot_every
+        self.busy = busy or (lambda: False)
+        self.max_busy_wait = max_busy_wait
+
+        self.feature_names: Optional[Tuple[str, ...]] = None
+        self.classes: Optional[List[str]] = None
+        self.scaler = StandardScaler()
+        self.classifier = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=0)
+
+        self.labelled = 0
+        self.rejected = 0
+        self.trained_rows = 0
+        self.updates = 0
+        self.snapshots = 0
+        self.errors = 0
+        self.dropped_rows = 0
+        self.snapshot_errors = 0
+        self.prequential_scored = 0
+        self.prequential_correct = 0
+        self.last_snapshot: Optional[Dict] = None
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='online-learning')
+        self._pending: List[Tuple[np.ndarray, str]] = []
+        self._loop = None
+        self._task = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+        if os.path.exists(self.path):
+            self._resume()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.save_dir, f"{self.name}.pkl")
+
+    def _resume(self):
+        """Continue training from the last snapshot"""
+        try:
+            pipeline = joblib.load(self.path)
+            self.scaler, self.classifier = pipeline[0], pipeline[-1]
+            self.feature_names = tuple(pipeline.feature_names_)
+            self.classes = [str(c) for c in self.classifier.classes_]
+            self.updates = 1
+        except Exception as e:
+            print(f"⚠️  Could not resume {self.name} from {self.path}, starting fresh: {e}")
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    def submit(self, names: Sequence[str], row: np.ndarray, label: str, classes: Sequence[str]) -> bool:
+        """Queue one confirmed row; False if its features do not match the model's or are not finite"""
+        row = np.asarray(row, dtype=np.float64)
+        if self.feature_names is None:
+            self.feature_names = tuple(names)
+            self.classes = [str(c) for c in classes]
+        # e.g. NaN skewness/kurtosis of a constant window would fail the whole batch
+        if (tuple(names) != self.feature_names or str(label) not in self.classes
+                or not np.isfinite(row).all()):
+            self.rejected += 1
+            return False
+
+        self._ensure_started()
+        self._pending.append((row, str(label)))
+        self.labelled += 1
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _update(self, X: np.ndarray, y: np.ndarray):
+        """Test-then-train on one batch; the model is left unchanged if training fails"""
+        if self.updates:
+            predicted = self.classifier.predict(self.scaler.transform(X))
+            self.prequential_scored += len(y)
+            self.prequential_correct += int(np.sum(predicted == y))
+
+        # Train copies and swap both in together, so the scaler never
+        # absorbs rows the classifier did not learn from
+        scaler, classifier = copy.deepcopy(self.scaler), copy.deepcopy(self.classifier)
+        scaler.partial_fit(X)
+        classifier.partial_fit(scaler.transform(X), y, classes=self.classes)
+        self.scaler, self.classifier = scaler, classifier
+        self.trained_rows += len(y)
+        self.updates += 1
+
+    def _snapshot(self) -> str:
+        """Write scaler + classifier as one pipeline, atomically"""
+        pipeline = make_pipeline(self.scaler, self.classifier)
+        pipeline.feature_names_ = list(self.feature_names)
+        os.makedirs(self.save_dir, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        joblib.dump(pipeline, tmp_path)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+    async def _run(self):
+        while True:
+            if len(self._pending) < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.max_wait)
+                except asyncio.TimeoutError:
+                    pass
+            if not self._pending:
+                continue
+
+            # Give way to queued predictions, but not indefinitely
+            deadline = self._loop.time() + self.max_busy_wait
+            while self.busy() and self._loop.time() < deadline:
+                await asyncio.sleep(0.01)
+
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            X = np.vstack([row for row, _ in batch])
+            y = np.array([label for _, label in batch])
+            try:
+                await self._loop.run_in_executor(self._executor, self._update, X, y)
+            except Exception as e:
+                self.errors += 1
+                self.dropped_rows += len(batch)
+                print(f"⚠️  Online update of {self.name} failed, {len(batch)} rows dropped: {e}")
+                continue
+
+            # The batch is learned; a failed snapshot or promotion is retried at the next one
+            if self.updates % self.snapshot_every == 0:
+                try:
+                    path = await self._loop.run_in_executor(self._executor, self._snapshot)
+                    self.snapshots += 1
+                    self.last_snapshot = {"path": path, "updates": self.updates, "at": time.time()}
+                    if self.promote is not None:
+                        await self.promote(self.name, path)
+                except Exception as e:
+                    self.snapshot_errors += 1
+                    print(f"⚠️  Snapshot of {self.name} after update {self.updates} failed: {e}")
+
+    def stats(self) -> Dict:
+        """Label, update and snapshot counters with prequential accuracy"""
+        return {
+            "model": self.name,
+            "features": list(self.feature_names) if self.feature_names else None,
+            "classes": self.classes,
+            "labelled_rows": self.labelled,
+            "rejected_rows": self.rejected,
+            "pending_rows": len(self._pending),
+            "trained_rows": self.trained_rows,
+            "updates": self.updates,
+            "snapshots": self.snapshots,
+            "errors": self.errors,
+            "dropped_rows": self.dropped_rows,
+            "snapshot_errors": self.snapshot_errors,
+            "prequential_accuracy": (self.prequential_correct / self.prequential_scored
+                                     if self.prequential_scored else None),
+            "last_snapshot": self.last_snapshot
+        }
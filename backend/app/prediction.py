@@ -5,13 +5,16 @@ import pandas as pd
 from pathlib import Path
 from typing import Dict, Tuple
 from app.models import ExtractedFeatures
+from app.compiled_forest import compile_model
 
 class FaultPredictor:
     """Load model and make predictions"""
     
     def __init__(self, model_path: str = "ml_models/random_forest_model.pkl",
-                 scaler_path: str = "ml_models/scaler.pkl"):
-        """Initialize predictor with model and scaler"""
+                 scaler_path: str = "ml_models/scaler.pkl",
+                 backend: str = "sklearn"):
+        """Initialize predictor with model and scaler
+        backend: 'sklearn' or 'compiled' (flattened-array forest evaluator)"""
         
         self.model = None
         self.scaler = None
@@ -38,8 +41,8 @@ class FaultPredictor:
         # Load model
         try:
             with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
-            print(f"✅ Model loaded from {model_path}")
+                self.model = compile_model(pickle.load(f), backend=backend)
+            print(f"✅ Model loaded from {model_path} ({type(self.model).__name__})")
         except Exception as e:
             print(f"❌ Error loading model: {e}")
         
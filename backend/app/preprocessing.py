@@ -1,91 +1,38 @@
 # backend/app/preprocessing.py
 import numpy as np
-from scipy import stats
-from scipy.fft import fft, fftfreq
 from typing import Dict, Tuple
 from app.models import ExtractedFeatures
+from app.features import SPECTRUM_FEATURE_NAMES, feature_plan
 
 class SignalProcessor:
     """Extract features from vibration signals"""
     
+    TIME_FEATURES = SPECTRUM_FEATURE_NAMES[:7]
+    FREQUENCY_FEATURES = SPECTRUM_FEATURE_NAMES[7:]
+    
     @staticmethod
-    def extract_time_features(signal: np.ndarray) -> Dict[str, float]:
+    def _evaluate(signal: np.ndarray, sampling_rate: int, names) -> Dict[str, float]:
+        """Evaluate a feature plan on one signal; shared intermediates are computed once"""
+        x = np.asarray(signal, dtype=np.float64)[np.newaxis, :]
+        row = feature_plan(tuple(names)).evaluate(x, fs=sampling_rate)[0]
+        return {name: float(value) for name, value in zip(names, row)}
+    
+    @classmethod
+    def extract_time_features(cls, signal: np.ndarray) -> Dict[str, float]:
         """Extract time-domain features"""
-        
-        # Basic statistics
-        rms = np.sqrt(np.mean(signal**2))
-        peak = np.max(np.abs(signal))
-        std_dev = np.std(signal)
-        peak_to_peak = np.ptp(signal)
-        
-        # Shape features
-        crest_factor = peak / rms if rms > 0 else 0
-        kurtosis = stats.kurtosis(signal)
-        skewness = stats.skew(signal)
-        
-        return {
-            'rms': float(rms),
-            'peak': float(peak),
-            'crest_factor': float(crest_factor),
-            'kurtosis': float(kurtosis),
-            'skewness': float(skewness),
-            'std_dev': float(std_dev),
-            'peak_to_peak': float(peak_to_peak)
-        }
+        return cls._evaluate(signal, 1, cls.TIME_FEATURES)
     
-    @staticmethod
-    def extract_frequency_features(signal: np.ndarray, sampling_rate: int) -> Dict[str, float]:
+    @classmethod
+    def extract_frequency_features(cls, signal: np.ndarray, sampling_rate: int) -> Dict[str, float]:
         """Extract frequency-domain features using FFT"""
-        
-        # Compute FFT
-        n = len(signal)
-        fft_vals = fft(signal)
-        fft_freq = fftfreq(n, 1/sampling_rate)
-        
-        # Consider only positive frequencies
-        positive_freq_idx = fft_freq > 0
-        fft_freq = fft_freq[positive_freq_idx]
-        fft_magnitude = np.abs(fft_vals[positive_freq_idx])
-        
-        # Dominant frequency
-        dominant_idx = np.argmax(fft_magnitude)
-        dominant_frequency = fft_freq[dominant_idx]
-        peak_fft_magnitude = fft_magnitude[dominant_idx]
-        
-        # Top 3 frequencies
-        top_indices = np.argsort(fft_magnitude)[-3:][::-1]
-        top_freq_1 = fft_freq[top_indices[0]] if len(top_indices) > 0 else 0
-        top_freq_2 = fft_freq[top_indices[1]] if len(top_indices) > 1 else 0
-        top_freq_3 = fft_freq[top_indices[2]] if len(top_indices) > 2 else 0
-        
-        # Spectral entropy
-        psd = fft_magnitude**2
-        psd_norm = psd / np.sum(psd)
-        spectral_entropy = -np.sum(psd_norm * np.log2(psd_norm + 1e-12))
-        
-        # Frequency centroid
-        frequency_centroid = np.sum(fft_freq * fft_magnitude) / np.sum(fft_magnitude)
-        
-        return {
-            'dominant_frequency': float(dominant_frequency),
-            'peak_fft_magnitude': float(peak_fft_magnitude),
-            'top_freq_1': float(top_freq_1),
-            'top_freq_2': float(top_freq_2),
-            'top_freq_3': float(top_freq_3),
-            'spectral_entropy': float(spectral_entropy),
-            'frequency_centroid': float(frequency_centroid)
-        }
+        return cls._evaluate(signal, sampling_rate, cls.FREQUENCY_FEATURES)
     
     @classmethod
     def extract_all_features(cls, signal: np.ndarray, sampling_rate: int) -> ExtractedFeatures:
         """Extract all features and return as Pydantic model"""
         
-        # Extract features
-        time_features = cls.extract_time_features(signal)
-        freq_features = cls.extract_frequency_features(signal, sampling_rate)
-        
-        # Combine all features
-        all_features = {**time_features, **freq_features}
+        # One plan for both domains, so |x|, moments and the spectrum are shared
+        all_features = cls._evaluate(signal, sampling_rate, SPECTRUM_FEATURE_NAMES)
         
         return ExtractedFeatures(**all_features)
     
@@ -0,0 +1,165 @@
+# backend/app/report_cache.py
+import asyncio
+import glob
+import hashlib
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+def report_key(signal, sampling_rate: int, model_version: str) -> str:
+    """Content address of a report: signal samples, sampling rate and model version"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(signal, dtype='<f8').tobytes())
+    digest.update(f"|{int(sampling_rate)}|{model_version}".encode())
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """
+    Content-addressed store of rendered PDF reports.
+
+    PDFs are kept in an in-memory LRU bounded by `max_bytes`. When
+    `cache_dir` is set they are also written to `<key>.pdf` files there, so
+    the cache survives restarts; the directory is trimmed to `max_disk_bytes`
+    by dropping the least recently used files.
+
+    `get_or_render` is single-flight: concurrent requests for the same key
+    await one shared render instead of rendering once each.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def _remember(self, key: str, pdf_bytes: bytes):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = pdf_bytes
+            self._bytes += len(pdf_bytes)
+
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                pdf_bytes = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # mark as recently used for trimming
+        return pdf_bytes
+
+    def _write_disk(self, key: str, pdf_bytes: bytes):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, path)
+        self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        for path in glob.glob(os.path.join(self.cache_dir, '*.pdf')):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached PDF for `key`, from memory or disk"""
+        with self._lock:
+            pdf_bytes = self._entries.get(key)
+            if pdf_bytes is not None:
+                self._entries.move_to_end(key)
+                return pdf_bytes
+
+        pdf_bytes = self._read_disk(key)
+        if pdf_bytes is not None:
+            self._remember(key, pdf_bytes)
+        return pdf_bytes
+
+    def put(self, key: str, pdf_bytes: bytes):
+        """Store a rendered PDF"""
+        self._remember(key, pdf_bytes)
+        self._write_disk(key, pdf_bytes)
+
+    async def get_or_render(self, key: str,
+                            render: Callable[[], Awaitable[bytes]]) -> Tuple[bytes, str]:
+        """
+        Cached PDF for `key`, rendering it at most once at a time.
+        Returns (pdf_bytes, source) with source 'hit', 'miss' or 'coalesced'.
+        """
+        pdf_bytes = await asyncio.to_thread(self.get, key)
+        if pdf_bytes is not None:
+            self.hits += 1
+            return pdf_bytes, 'hit'
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), 'coalesced'
+
+        async def render_and_store():
+            try:
+                pdf_bytes = await render()
+                await asyncio.to_thread(self.put, key, pdf_bytes)
+                return pdf_bytes
+            finally:
+                self._inflight.pop(key, None)
+
+        # The render runs as its own task so a disconnecting client does not
+        # cancel it for the requests waiting on the same key
+        self.misses += 1
+        task = asyncio.get_running_loop().create_task(render_and_store())
+        self._inflight[key] = task
+        return await asyncio.shield(task), 'miss'
+
+    def stats(self) -> Dict:
+        """Cache size and hit counters"""
+        with self._lock:
+            entries, size = len(self._entries), self._bytes
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "disk_dir": self.cache_dir,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
@@ -15,6 +15,9 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 from reportlab.pdfgen import canvas
 
+from app.decimation import PLOT_DPI, PLOT_FIGSIZE, PLOT_MAX_BUCKETS, minmax_envelope
+from app.spectral import Spectrum
+
 class NumberedCanvas(canvas.Canvas):
     """Custom canvas with page numbers and elegant header"""
     def __init__(self, *args, **kwargs):
@@ -105,8 +108,9 @@ class ReportGenerator:
             spaceAfter=3
         ))
     
-    def generate_pdf(self, signal, sampling_rate, features, prediction, confidence, probabilities):
-        """Generate comprehensive PDF report"""
+    def generate_pdf(self, signal, sampling_rate, features, prediction, confidence, probabilities,
+                     spectrum_plot=None):
+        """Generate comprehensive PDF report (spectrum_plot: Spectrum.plot_envelope() if precomputed)"""
         
         buffer = io.BytesIO()
         
@@ -237,7 +241,7 @@ class ReportGenerator:
         story.append(Image(time_plot, width=6.5*inch, height=2.8*inch))
         story.append(Spacer(1, 0.25*inch))
         
-        freq_plot = self._generate_freq_plot(signal, sampling_rate)
+        freq_plot = self._generate_freq_plot(signal, sampling_rate, spectrum_plot)
         story.append(Image(freq_plot, width=6.5*inch, height=2.8*inch))
         story.append(Spacer(1, 0.4*inch))
         
@@ -393,10 +397,12 @@ class ReportGenerator:
     def _generate_time_plot(self, signal, sampling_rate):
         """Generate professional time-domain plot"""
         
-        fig, ax = plt.subplots(figsize=(9, 3.2), facecolor='white')
+        fig, ax = plt.subplots(figsize=PLOT_FIGSIZE, facecolor='white')
         fig.patch.set_facecolor('#f8fafc')
         
+        signal = np.asarray(signal)
         time = np.arange(len(signal)) / sampling_rate
+        time, signal = minmax_envelope(time, signal, PLOT_MAX_BUCKETS)
         
         ax.plot(time, signal, color='#667eea', linewidth=1.5, alpha=0.9, label='Vibration Signal')
         ax.fill_between(time, signal, alpha=0.12, color='#667eea')
@@ -419,24 +425,23 @@ class ReportGenerator:
         plt.tight_layout(pad=0.5)
         
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=200, bbox_inches='tight', 
+        plt.savefig(buffer, format='png', dpi=PLOT_DPI, bbox_inches='tight', 
                    facecolor='#f8fafc', edgecolor='none')
         plt.close(fig)
         buffer.seek(0)
         
         return buffer
     
-    def _generate_freq_plot(self, signal, sampling_rate):
+    def _generate_freq_plot(self, signal, sampling_rate, spectrum_plot=None):
         """Generate professional frequency-domain plot"""
         
-        fig, ax = plt.subplots(figsize=(9, 3.2), facecolor='white')
+        fig, ax = plt.subplots(figsize=PLOT_FIGSIZE, facecolor='white')
         fig.patch.set_facecolor('#f8fafc')
         
-        fft = np.fft.fft(signal)
-        freq = np.fft.fftfreq(len(signal), 1/sampling_rate)
-        positive_idx = freq > 0
-        freq = freq[positive_idx]
-        fft_mag = np.abs(fft[positive_idx])
+        # One min/max pair per pixel; the caller passes it when it already holds the FFT
+        if spectrum_plot is None:
+            spectrum_plot = Spectrum(signal, sampling_rate).plot_envelope()
+        freq, fft_mag, x_max = spectrum_plot
         
         ax.plot(freq, fft_mag, color='#ef4444', linewidth=1.5, alpha=0.9, label='FFT Magnitude')
         ax.fill_between(freq, fft_mag, alpha=0.12, color='#ef4444')
@@ -448,7 +453,7 @@ class ReportGenerator:
         
         ax.grid(True, alpha=0.2, linestyle='--', linewidth=0.7, color='#94a3b8')
         ax.set_facecolor('#ffffff')
-        ax.set_xlim(0, min(2500, freq.max()))
+        ax.set_xlim(0, x_max)
         ax.legend(loc='upper right', framealpha=0.95, fontsize=9)
         
         for spine in ax.spines.values():
@@ -460,7 +465,7 @@ class ReportGenerator:
         plt.tight_layout(pad=0.5)
         
         buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=200, bbox_inches='tight', 
+        plt.savefig(buffer, format='png', dpi=PLOT_DPI, bbox_inches='tight', 
                    facecolor='#f8fafc', edgecolor='none')
         plt.close(fig)
         buffer.seek(0)
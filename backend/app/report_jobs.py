@@ -0,0 +1,238 @@
+# backend/app/report_jobs.py
+import asyncio
+import os
+import sqlite3
+import time
+import uuid
+import numpy as np
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# render(signal, sampling_rate) -> PDF bytes
+RenderFn = Callable[[np.ndarray, int], Awaitable[bytes]]
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+# Idle workers look for queued jobs at least this often, even without a wakeup
+IDLE_POLL_INTERVAL = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    sampling_rate INTEGER NOT NULL,
+    signal BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS report_jobs_queue ON report_jobs (status, created_at);
+"""
+
+
+class ReportJobQueue:
+    """
+    Persistent queue of PDF report jobs.
+
+    Jobs live in a SQLite table in `jobs_dir` (the signal is stored with the
+    row as float64 bytes) and finished PDFs are written to `<id>.pdf` next to
+    it. `concurrency` worker tasks claim queued jobs oldest first, so bulk
+    submissions never occupy more than that many report renders at once.
+    Jobs that were running when the process stopped are queued again on
+    `start`, and finished jobs older than `retention` seconds are deleted.
+    """
+
+    def __init__(self, jobs_dir: str, render: RenderFn, concurrency: int = 1,
+                 retention: float = 7 * 24 * 3600, max_attempts: int = 3):
+        self.jobs_dir = jobs_dir
+        self.db_path = os.path.join(jobs_dir, 'jobs.sqlite3')
+        self.render = render
+        self.concurrency = concurrency
+        self.retention = retention
+        self.max_attempts = max_attempts
+        self._loop = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+
+        os.makedirs(jobs_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit connection per operation; safe to use from any thread
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            yield conn
+        finally:
+            conn.close()
+
+    def pdf_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.pdf")
+
+    # --- database operations (run in a thread) ---
+
+    def _recover(self):
+        """Requeue interrupted jobs and drop expired ones"""
+        cutoff = time.time() - self.retention
+        with self._connect() as conn:
+            conn.execute("UPDATE report_jobs SET status = 'queued', started_at = NULL "
+                         "WHERE status = 'running'")
+            expired = [row['id'] for row in conn.execute(
+                "SELECT id FROM report_jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (cutoff,)
+            )]
+            conn.executemany("DELETE FROM report_jobs WHERE id = ?", [(i,) for i in expired])
+
+        for job_id in expired:
+            try:
+                os.remove(self.pdf_path(job_id))
+            except FileNotFoundError:
+                pass
+
+    def _insert(self, signal: np.ndarray, sampling_rate: int) -> str:
+        job_id = uuid.uuid4().hex
+        blob = np.ascontiguousarray(signal, dtype='<f8').tobytes()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO report_jobs (id, status, sampling_rate, signal, created_at) "
+                "VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, int(sampling_rate), blob, time.time())
+            )
+        return job_id
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Atomically move the oldest queued job to running"""
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT id, sampling_rate, signal FROM report_jobs "
+                "WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE report_jobs SET status = 'running', started_at = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (time.time(), row['id'])
+                )
+            conn.execute('COMMIT')
+        return row
+
+    def _finish(self, job_id: str, pdf_bytes: Optional[bytes], error: Optional[str]):
+        if pdf_bytes is not None:
+            path = self.pdf_path(job_id)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, path)
+
+        with self._connect() as conn:
+            if error is None:
+                conn.execute("UPDATE report_jobs SET status = 'done', finished_at = ?, error = NULL "
+                             "WHERE id = ?", (time.time(), job_id))
+            else:
+                # Retry until max_attempts, then give up
+                conn.execute(
+                    "UPDATE report_jobs SET error = ?, "
+                    "status = CASE WHEN attempts < ? THEN 'queued' ELSE 'failed' END, "
+                    "finished_at = CASE WHEN attempts < ? THEN NULL ELSE ? END "
+                    "WHERE id = ?",
+                    (error, self.max_attempts, self.max_attempts, time.time(), job_id)
+                )
+
+    def _fetch(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, sampling_rate, length(signal) / 8 AS samples, created_at, "
+                "started_at, finished_at, attempts, error FROM report_jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = dict(row)
+            if job['status'] == 'queued':
+                job['queue_position'] = conn.execute(
+                    "SELECT COUNT(*) FROM report_jobs WHERE status = 'queued' AND created_at < ?",
+                    (job['created_at'],)
+                ).fetchone()[0]
+        return job
+
+    def _counts(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM report_jobs GROUP BY status").fetchall()
+        counts = {name: 0 for name in JOB_STATUSES}
+        counts.update({status: n for status, n in rows})
+        return counts
+
+    # --- async API ---
+
+    async def start(self):
+        """Recover the job table and start the workers on the running loop"""
+        await asyncio.to_thread(self._recover)
+        self._ensure_workers()
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers and all(not task.done() for task in self._workers):
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._workers = [loop.create_task(self._work()) for _ in range(self.concurrency)]
+        self._wakeup.set()
+
+    async def stop(self):
+        """Cancel the workers; running jobs are requeued on the next start"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, signal: np.ndarray, sampling_rate: int) -> str:
+        """Queue a report and return its job id"""
+        self._ensure_workers()
+        job_id = await asyncio.to_thread(self._insert, signal, sampling_rate)
+        self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """Job status row, or None for an unknown id"""
+        return await asyncio.to_thread(self._fetch, job_id)
+
+    async def _work(self):
+        while True:
+            # Clear before claiming: a submit that lands while _claim runs sets
+            # the event again, so its wakeup cannot be lost
+            self._wakeup.clear()
+            row = await asyncio.to_thread(self._claim)
+            if row is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=IDLE_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # More work may be queued: let the next idle worker look as well
+            self._wakeup.set()
+
+            job_id = row['id']
+            signal = np.frombuffer(row['signal'], dtype='<f8')
+            try:
+                pdf_bytes = await self.render(signal, row['sampling_rate'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Report job {job_id} failed: {str(e)}")
+                await asyncio.to_thread(self._finish, job_id, None, str(e) or type(e).__name__)
+                continue
+            await asyncio.to_thread(self._finish, job_id, pdf_bytes, None)
+
+    async def stats(self) -> Dict:
+        """Job counts by status and worker settings"""
+        return {
+            "concurrency": self.concurrency,
+            "workers_running": sum(not task.done() for task in self._workers),
+            "jobs": await asyncio.to_thread(self._counts)
+        }
@@ -0,0 +1,116 @@
+# backend/app/report_worker.py
+import asyncio
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+# One ReportGenerator per worker process, built by the pool initializer
+_worker_generator = None
+
+
+def _init_worker():
+    """Import matplotlib/ReportLab and build the generator once per worker"""
+    global _worker_generator
+    from app.report_generator import ReportGenerator
+    _worker_generator = ReportGenerator()
+
+
+def _warm_up() -> bool:
+    return _worker_generator is not None
+
+
+def _render(signal: np.ndarray, sampling_rate: int, features: Dict[str, float],
+            prediction: str, confidence: float, probabilities: Dict[str, float],
+            spectrum_plot=None) -> bytes:
+    return _worker_generator.generate_pdf(
+        signal=np.asarray(signal, dtype=np.float64),
+        sampling_rate=sampling_rate,
+        features=features,
+        prediction=prediction,
+        confidence=confidence,
+        probabilities=probabilities,
+        spectrum_plot=spectrum_plot
+    )
+
+
+class ReportTimeout(Exception):
+    """A report did not finish rendering within the configured timeout"""
+
+
+class ReportRenderer:
+    """
+    Renders PDF reports in a bounded pool of worker processes.
+
+    Matplotlib rasterization and ReportLab layout are CPU-bound and hold the
+    GIL, so they run in `max_workers` spawned processes that import both
+    libraries up front. The signal crosses the process boundary as one
+    float32 array. Reports that do not finish within `timeout` seconds raise
+    ReportTimeout; one still queued is cancelled, one already rendering is
+    left to finish in its worker.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 60.0):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rendered = 0
+        self.timed_out = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: never fork a server process that already runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    async def start(self):
+        """Spawn every worker now so the first report does not pay the imports"""
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        await asyncio.gather(*[
+            loop.run_in_executor(pool, _warm_up) for _ in range(self.max_workers)
+        ])
+
+    async def render(self, signal, sampling_rate: int, features: Dict[str, float],
+                     prediction: str, confidence: float,
+                     probabilities: Dict[str, float], spectrum_plot=None) -> bytes:
+        """PDF bytes for one report, rendered off the event loop"""
+        loop = asyncio.get_running_loop()
+        compact = np.ascontiguousarray(signal, dtype=np.float32)
+        args = (compact, sampling_rate, features, prediction, confidence, probabilities, spectrum_plot)
+
+        try:
+            pdf_bytes = await asyncio.wait_for(
+                loop.run_in_executor(self._pool(), _render, *args), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise ReportTimeout(f"Report rendering exceeded {self.timeout:g}s")
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory): replace the pool for later requests
+            self.shutdown()
+            raise
+
+        self.rendered += 1
+        return pdf_bytes
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict:
+        """Pool settings and counters"""
+        return {
+            "workers": self.max_workers,
+            "timeout_s": self.timeout,
+            "running": self._executor is not None,
+            "rendered": self.rendered,
+            "timed_out": self.timed_out
+        }
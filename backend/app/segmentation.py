@@ -0,0 +1,49 @@
+# backend/app/segmentation.py
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Iterator, Tuple
+
+
+def hop_length(segment_length: int, overlap: float) -> int:
+    """Samples between segment starts for a fractional overlap (0.5 -> half a segment)"""
+    step = int(segment_length * (1 - overlap))
+    if step < 1:
+        raise ValueError(f"Overlap {overlap} leaves no hop between {segment_length}-sample segments")
+    return step
+
+
+def segment_count(n_samples: int, segment_length: int, step: int) -> int:
+    """Number of full segments starting every `step` samples"""
+    return max(0, (n_samples - segment_length) // step + 1)
+
+
+def strided_segments(signal: np.ndarray, segment_length: int, step: int) -> np.ndarray:
+    """
+    Read-only (n_segments, segment_length) view of every full segment.
+
+    Segment i is signal[i * step:i * step + segment_length]. No samples are
+    copied, so overlapping segments of a memory-mapped recording cost no
+    memory until a consumer reads them.
+    """
+    signal = np.asarray(signal)
+    if signal.ndim != 1:
+        raise ValueError("Expected a 1-D signal")
+    if segment_length < 1 or step < 1:
+        raise ValueError("segment_length and step must be positive")
+    if len(signal) < segment_length:
+        return np.empty((0, segment_length), dtype=signal.dtype)
+    return sliding_window_view(signal, segment_length)[::step]
+
+
+def iter_segment_chunks(signal: np.ndarray, segment_length: int, step: int,
+                        chunk_segments: int = 1024) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield (index of first segment, view of up to `chunk_segments` segments).
+
+    Each chunk is a slice of the strided view, so consumers that copy or
+    reduce one chunk at a time (feature extraction does) keep memory bounded
+    by the chunk size however long the recording is.
+    """
+    segments = strided_segments(signal, segment_length, step)
+    for first in range(0, len(segments), chunk_segments):
+        yield first, segments[first:first + chunk_segments]
@@ -0,0 +1,154 @@
+# backend/app/shadow.py
+import asyncio
+import random
+import threading
+import time
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Sequence
+
+from app.inference import Histogram
+
+LATENCY_MS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250)
+
+
+def align_labels(labels: Sequence, reference: Sequence) -> Dict:
+    """
+    Map another model's class labels onto the reference labels.
+    Labels match exactly or by their first '_' token ('inner_007' -> 'inner_race').
+    """
+    by_prefix: Dict[str, list] = {}
+    for ref in reference:
+        by_prefix.setdefault(str(ref).split('_')[0], []).append(ref)
+
+    mapping = {}
+    for label in labels:
+        if label in reference:
+            mapping[label] = label
+            continue
+        candidates = by_prefix.get(str(label).split('_')[0], [])
+        mapping[label] = candidates[0] if len(candidates) == 1 else label
+    return mapping
+
+
+class ShadowEvaluator:
+    """
+    Scores a sample of production feature rows with a candidate model.
+
+    `submit` is called after the primary model has answered. With
+    probability `fraction` the rows and the primary labels are queued; a
+    background task scores them with `candidate_fn(rows)`, which returns
+    one label per row, on its own thread and
+    records the candidate's latency and a primary-vs-candidate confusion
+    matrix. Submissions are dropped, never waited on, when `max_pending`
+    rows are already queued or `busy()` reports the primary path is loaded,
+    so shadow work cannot add latency to production requests.
+    """
+
+    def __init__(self, candidate_name: str, candidate_fn: Callable[[np.ndarray], Sequence],
+                 fraction: float = 0.1, max_pending: int = 256,
+                 busy: Optional[Callable[[], bool]] = None):
+        self.candidate_name = candidate_name
+        self.candidate_fn = candidate_fn
+        self.fraction = fraction
+        self.max_pending = max_pending
+        self.busy = busy or (lambda: False)
+
+        self.latency_ms: Dict[str, Histogram] = {}
+        self.confusion: Dict[str, Dict[str, int]] = {}
+        self.sampled = 0
+        self.scored = 0
+        self.agreed = 0
+        self.dropped = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+        self._queue: deque = deque()
+        self._pending_rows = 0
+        self._loop = None
+        self._task = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def observe_latency(self, model_name: str, ms: float):
+        """Record one model call; used for the primary model as well"""
+        with self._lock:
+            histogram = self.latency_ms.get(model_name)
+            if histogram is None:
+                histogram = self.latency_ms[model_name] = Histogram(LATENCY_MS_BUCKETS)
+        histogram.observe(ms)
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue.clear()
+            self._pending_rows = 0
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+
+    def submit(self, rows: np.ndarray, primary_labels: Sequence, primary_classes: Sequence):
+        """Maybe queue rows for shadow scoring; never blocks"""
+        if self.fraction <= 0 or random.random() >= self.fraction:
+            return
+        self._ensure_started()
+        self.sampled += 1
+
+        if self._pending_rows + len(rows) > self.max_pending or self.busy():
+            self.dropped += 1
+            return
+
+        self._queue.append((np.array(rows, copy=True), list(primary_labels), list(primary_classes)))
+        self._pending_rows += len(rows)
+        self._wakeup.set()
+
+    def _score(self, rows: np.ndarray, primary_labels: list, primary_classes: list):
+        start = time.perf_counter()
+        labels = list(self.candidate_fn(rows))
+        self.observe_latency(self.candidate_name, (time.perf_counter() - start) * 1000)
+
+        mapping = align_labels(list(dict.fromkeys(labels)), primary_classes)
+        with self._lock:
+            for primary, label in zip(primary_labels, labels):
+                candidate = mapping[label]
+                row = self.confusion.setdefault(str(primary), {})
+                row[str(candidate)] = row.get(str(candidate), 0) + 1
+                self.scored += 1
+                self.agreed += int(candidate == primary)
+
+    async def _run(self):
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            rows, primary_labels, primary_classes = self._queue.popleft()
+            try:
+                await self._loop.run_in_executor(self._executor, self._score, rows,
+                                                 primary_labels, primary_classes)
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️  Shadow model {self.candidate_name} failed: {e}")
+            finally:
+                self._pending_rows -= len(rows)
+
+    def stats(self) -> Dict:
+        """Sampling counters, agreement, confusion matrix and latency histograms"""
+        with self._lock:
+            confusion = {primary: dict(row) for primary, row in self.confusion.items()}
+            scored, agreed = self.scored, self.agreed
+            latency = dict(self.latency_ms)
+        return {
+            "candidate": self.candidate_name,
+            "fraction": self.fraction,
+            "sampled_requests": self.sampled,
+            "dropped_requests": self.dropped,
+            "errors": self.errors,
+            "pending_rows": self._pending_rows,
+            "scored_rows": scored,
+            "agreement": agreed / scored if scored else None,
+            "confusion": confusion,
+            "latency_ms": {name: histogram.snapshot() for name, histogram in latency.items()}
+        }
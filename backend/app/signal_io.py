@@ -0,0 +1,128 @@
+# backend/app/signal_io.py
+import io
+import numpy as np
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Tuple, Type
+
+OCTET_STREAM = 'application/octet-stream'
+NPY_MEDIA_TYPES = ('application/x-npy', 'application/npy')
+NPY_MAGIC = b'\x93NUMPY'
+
+SAMPLING_RATE_HEADER = 'x-sampling-rate'
+SAMPLE_DTYPE_HEADER = 'x-sample-dtype'
+DEFAULT_SAMPLING_RATE = 12000
+
+# Raw bodies are little-endian, independent of the server's byte order
+RAW_SAMPLE_DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float64': np.dtype('<f8')
+}
+
+
+def signal_body_openapi(json_model: Type[BaseModel]) -> Dict:
+    """OpenAPI requestBody for endpoints that accept JSON, raw float or .npy signals"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": json_model.model_json_schema()},
+                OCTET_STREAM: {
+                    "schema": {"type": "string", "format": "binary"},
+                    "description": (
+                        "Little-endian samples. Set X-Sample-Dtype (float32 | float64, "
+                        "default float32) and X-Sampling-Rate (default 12000)."
+                    )
+                },
+                NPY_MEDIA_TYPES[0]: {
+                    "schema": {"type": "string", "format": "binary"},
+                    "description": "1-D .npy array. Set X-Sampling-Rate (default 12000)."
+                }
+            }
+        }
+    }
+
+
+def _sampling_rate_from_headers(request: Request) -> int:
+    value = request.headers.get(SAMPLING_RATE_HEADER)
+    if value is None:
+        return DEFAULT_SAMPLING_RATE
+    try:
+        sampling_rate = int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {SAMPLING_RATE_HEADER} header: {value!r}")
+    if sampling_rate <= 0:
+        raise HTTPException(status_code=400, detail=f"{SAMPLING_RATE_HEADER} must be positive")
+    return sampling_rate
+
+
+def _parse_raw(body: bytes, request: Request) -> np.ndarray:
+    """Zero-copy view of a raw little-endian float body"""
+    dtype_name = request.headers.get(SAMPLE_DTYPE_HEADER, 'float32').lower()
+    dtype = RAW_SAMPLE_DTYPES.get(dtype_name)
+    if dtype is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported {SAMPLE_DTYPE_HEADER} {dtype_name!r} (expected one of {sorted(RAW_SAMPLE_DTYPES)})"
+        )
+    if len(body) % dtype.itemsize:
+        raise HTTPException(status_code=400, detail=f"Body length is not a multiple of {dtype.itemsize} bytes")
+    return np.frombuffer(body, dtype=dtype)
+
+
+def _parse_npy(body: bytes) -> np.ndarray:
+    """Zero-copy view of a .npy body (header parsed, data read with frombuffer)"""
+    stream = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid .npy body: {e}")
+
+    if dtype.kind not in 'fiu' or dtype.hasobject:
+        raise HTTPException(status_code=400, detail=f"Unsupported .npy dtype {dtype}")
+    if len(shape) != 1:
+        raise HTTPException(status_code=400, detail=f"Expected a 1-D .npy array, got shape {shape}")
+
+    offset = stream.tell()
+    count = shape[0]
+    if len(body) - offset < count * dtype.itemsize:
+        raise HTTPException(status_code=400, detail="Truncated .npy body")
+    return np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+
+
+def _require_finite(signal: np.ndarray) -> np.ndarray:
+    if not np.isfinite(signal).all():
+        raise HTTPException(status_code=400, detail="Signal contains NaN or infinite samples")
+    return signal
+
+
+async def read_signal_body(request: Request, json_model: Type[BaseModel]) -> Tuple[np.ndarray, int]:
+    """
+    Read a signal from the request body based on its Content-Type.
+
+    JSON bodies are validated with `json_model` exactly as a typed FastAPI body
+    would be; application/octet-stream and .npy bodies are mapped straight onto
+    a NumPy buffer without creating per-sample Python objects.
+    Returns (signal, sampling_rate).
+    """
+    content_type = request.headers.get('content-type', 'application/json').split(';')[0].strip().lower()
+    body = await request.body()
+
+    if content_type in NPY_MEDIA_TYPES or (content_type == OCTET_STREAM and body.startswith(NPY_MAGIC)):
+        return _require_finite(_parse_npy(body)), _sampling_rate_from_headers(request)
+
+    if content_type == OCTET_STREAM:
+        return _require_finite(_parse_raw(body, request)), _sampling_rate_from_headers(request)
+
+    try:
+        data = json_model.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)]
+        )
+    return np.asarray(data.signal, dtype=np.float64), data.sampling_rate
@@ -0,0 +1,101 @@
+# backend/app/spectral.py
+import numpy as np
+from functools import lru_cache
+from scipy.signal import get_window, welch
+from typing import Dict, Tuple
+
+from app.decimation import PLOT_MAX_BUCKETS, minmax_envelope
+
+WELCH_NPERSEG = 1024
+# Upper end of the frequency axis in report plots and the /spectrum API
+SPECTRUM_MAX_FREQ = 2500
+
+
+@lru_cache(maxsize=32)
+def hann_window(nperseg: int) -> np.ndarray:
+    """Periodic Hann window of `nperseg` samples, as scipy's welch builds it for 'hann'"""
+    window = get_window('hann', nperseg)
+    window.flags.writeable = False
+    return window
+
+
+@lru_cache(maxsize=64)
+def rfft_frequencies(n: int, fs: float) -> np.ndarray:
+    """Bin frequencies of an n-sample rfft at sampling rate fs"""
+    freqs = np.fft.rfftfreq(n, 1 / fs)
+    freqs.flags.writeable = False
+    return freqs
+
+
+class Spectrum:
+    """
+    Spectral views of an (n_segments, n_samples) signal array.
+
+    The one-sided FFT and the Welch PSD are each computed at most once, on
+    first access, so feature extraction, report plots and the /spectrum API
+    can share one Spectrum per signal instead of each transforming the
+    samples again. Hann windows and frequency grids are cached per
+    (n, nperseg, fs) across instances.
+    """
+
+    def __init__(self, x, fs: float, nperseg: int = WELCH_NPERSEG, _shared: Dict = None):
+        x = np.asarray(x, dtype=np.float64)
+        self.x = x[np.newaxis, :] if x.ndim == 1 else x
+        self.fs = fs
+        self.nperseg = min(nperseg, self.x.shape[1])
+        # The FFT does not depend on fs, so at_rate() views share it
+        self._shared = {} if _shared is None else _shared
+        self._welch = None
+
+    @property
+    def n(self) -> int:
+        return self.x.shape[1]
+
+    @property
+    def rfft(self) -> np.ndarray:
+        """(n_segments, n // 2 + 1) complex one-sided FFT"""
+        if 'rfft' not in self._shared:
+            self._shared['rfft'] = np.fft.rfft(self.x, axis=-1)
+        return self._shared['rfft']
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        """|rfft| of every segment"""
+        if 'magnitude' not in self._shared:
+            self._shared['magnitude'] = np.abs(self.rfft)
+        return self._shared['magnitude']
+
+    @property
+    def freqs(self) -> np.ndarray:
+        return rfft_frequencies(self.n, self.fs)
+
+    @property
+    def welch(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(freqs, psd) Welch estimate of every segment (periodic Hann, constant detrend)"""
+        if self._welch is None:
+            self._welch = welch(self.x, fs=self.fs, window=hann_window(self.nperseg),
+                                nperseg=self.nperseg, axis=-1)
+        return self._welch
+
+    def at_rate(self, fs: float) -> "Spectrum":
+        """The same samples read at another sampling rate; the FFT is shared"""
+        if fs == self.fs:
+            return self
+        return Spectrum(self.x, fs, self.nperseg, _shared=self._shared)
+
+    def plot_envelope(self, max_freq: float = SPECTRUM_MAX_FREQ,
+                      n_buckets: int = PLOT_MAX_BUCKETS,
+                      row: int = 0) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        (freqs, magnitudes, x_max) of one segment's FFT, reduced for plotting.
+        Bins up to x_max keep one min/max pair per bucket; bins beyond it are
+        off the axis and keep only their extremes so the y-scale is unchanged.
+        DC is left out.
+        """
+        freq = self.freqs
+        mag = self.magnitude[row]
+        x_max = float(min(max_freq, freq[-1]))
+        split = np.searchsorted(freq, x_max, side='right') + 1
+        shown = minmax_envelope(freq[1:split], mag[1:split], n_buckets)
+        hidden = minmax_envelope(freq[split:], mag[split:], 1)
+        return np.concatenate((shown[0], hidden[0])), np.concatenate((shown[1], hidden[1])), x_max
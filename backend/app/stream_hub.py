@@ -0,0 +1,116 @@
+# backend/app/stream_hub.py
+import asyncio
+from typing import AsyncIterator, Callable, Dict, Hashable, Optional, Set
+
+
+class StreamChannel:
+    """One producer task whose events are fanned out to subscriber queues"""
+
+    def __init__(self, key: Hashable, factory: Callable[[], AsyncIterator[str]],
+                 queue_size: int):
+        self.key = key
+        self.queue_size = queue_size
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.events_published = 0
+        self.events_dropped = 0
+        self._factory = factory
+        self._task: Optional[asyncio.Task] = None
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._produce())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def _publish(self, event: Optional[str]):
+        for queue in list(self.subscribers):
+            if queue.full():
+                # Slow client: drop its oldest event rather than stall everyone
+                queue.get_nowait()
+                self.events_dropped += 1
+            queue.put_nowait(event)
+
+    async def _produce(self):
+        try:
+            async for event in self._factory():
+                self.events_published += 1
+                self._publish(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Stream producer {self.key} failed: {e}")
+        # Producer finished: tell subscribers the stream is over
+        self._publish(None)
+
+    def add_subscriber(self) -> asyncio.Queue:
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        return queue
+
+    def remove_subscriber(self, queue: asyncio.Queue, idle_timeout: float,
+                          on_idle: Callable[["StreamChannel"], None]):
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            self._idle_handle = asyncio.get_running_loop().call_later(idle_timeout, on_idle, self)
+
+
+class StreamHub:
+    """
+    Publish/subscribe hub for server-sent event streams.
+
+    Each channel key has a single producer task that generates events once
+    and fans them out to every subscriber through a bounded per-client
+    queue. Subscribers join and leave at any time; the producer is started
+    by the first subscriber and stopped `idle_timeout` seconds after the
+    last one leaves.
+    """
+
+    def __init__(self, queue_size: int = 256, idle_timeout: float = 5.0):
+        self.queue_size = queue_size
+        self.idle_timeout = idle_timeout
+        self._channels: Dict[Hashable, StreamChannel] = {}
+
+    def _close_if_idle(self, channel: StreamChannel):
+        if not channel.subscribers and self._channels.get(channel.key) is channel:
+            del self._channels[channel.key]
+            channel.stop()
+
+    async def subscribe(self, key: Hashable,
+                        factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Yield the events of channel `key`, starting its producer if needed"""
+        channel = self._channels.get(key)
+        if channel is None or not channel.running:
+            channel = StreamChannel(key, factory, self.queue_size)
+            self._channels[key] = channel
+            channel.start()
+
+        queue = channel.add_subscriber()
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            channel.remove_subscriber(queue, self.idle_timeout, self._close_if_idle)
+
+    def stats(self) -> Dict:
+        """Subscriber and event counters per channel"""
+        return {
+            str(key): {
+                "subscribers": len(channel.subscribers),
+                "running": channel.running,
+                "events_published": channel.events_published,
+                "events_dropped": channel.events_dropped
+            }
+            for key, channel in self._channels.items()
+        }
@@ -0,0 +1,258 @@
+# backend/app/streaming.py
+import base64
+import json
+import numpy as np
+from collections import deque
+from scipy.signal import get_window
+from typing import Dict, Optional
+
+from app.features import (
+    FEATURE_FS, MIN_SIGNAL_LENGTH, WELCH_NPERSEG, assemble_features, features_to_dict
+)
+
+
+class SampleRing:
+    """Fixed-capacity ring buffer of float samples with vectorized appends"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity)
+        self.total = 0  # samples ever appended
+
+    @property
+    def full(self) -> bool:
+        return self.total >= self.capacity
+
+    def extend(self, values):
+        """Append a block of samples, overwriting the oldest"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        n = len(values)
+        if n >= self.capacity:
+            # Only the newest `capacity` samples survive; keep the oldest at total % capacity
+            self.total += n
+            pos = self.total % self.capacity
+            self._data[:] = np.roll(values[-self.capacity:], pos)
+            return
+
+        pos = self.total % self.capacity
+        head = min(n, self.capacity - pos)
+        self._data[pos:pos + head] = values[:head]
+        self._data[:n - head] = values[head:]
+        self.total += n
+
+    def values(self) -> np.ndarray:
+        """Copy of the buffered samples, oldest first"""
+        if not self.full:
+            return self._data[:self.total].copy()
+        pos = self.total % self.capacity
+        return np.concatenate((self._data[pos:], self._data[:pos]))
+
+
+class SlidingWindowFeatures:
+    """
+    Incrementally maintained training features over the last `window` samples.
+
+    Samples live in a fixed-size ring buffer. Running power sums of the
+    samples' offset from a reference value (the window mean at the last
+    resync, so a DC offset does not cancel catastrophically) give
+    mean/std/RMS/skewness/kurtosis, monotonic deques give peak and
+    peak-to-peak, and a recursive sliding DFT keeps the spectrum, so each
+    push costs O(window / 2) instead of a full recomputation.
+
+    The spectral features reproduce `welch(x, nperseg=window)`: the Hann
+    window is applied in the frequency domain as a 3-tap kernel on the DFT
+    bins, which is exact for a single Welch segment. Windows longer than
+    WELCH_NPERSEG are therefore not supported.
+
+    Running sums and the DFT are recomputed from the ring every
+    `resync_interval` samples (default: once per window) to stop
+    floating-point drift.
+    """
+
+    def __init__(self, window: int = MIN_SIGNAL_LENGTH, fs: float = FEATURE_FS,
+                 resync_interval: int = None):
+        if not MIN_SIGNAL_LENGTH <= window <= WELCH_NPERSEG:
+            raise ValueError(f"window must be between {MIN_SIGNAL_LENGTH} and {WELCH_NPERSEG} samples")
+
+        self.window = window
+        self.fs = fs
+        self.resync_interval = resync_interval or window
+
+        n_bins = window // 2 + 1
+        self._ring = np.zeros(window)
+        self._twiddle = np.exp(2j * np.pi * np.arange(n_bins) / window)
+        self._freqs = np.fft.rfftfreq(window, 1 / fs)
+
+        # Welch density scaling for one periodic-Hann segment, one-sided
+        hann = get_window('hann', window)
+        self._psd_scale = np.full(n_bins, 1.0 / (fs * np.sum(hann ** 2)))
+        if window % 2:
+            self._psd_scale[1:] *= 2
+        else:
+            self._psd_scale[1:-1] *= 2
+
+        self.reset()
+
+    def reset(self):
+        """Forget all samples"""
+        self._ring[:] = 0.0
+        self._count = 0   # samples seen, also the index of the next sample
+        self._filled = 0  # samples currently held in the ring
+        self._since_resync = 0
+        self._ref = 0.0  # d = x - ref
+        self._sums = np.zeros(6)  # d, d^2, d^3, d^4, |x|, sqrt|x|
+        self._spectrum = np.zeros(self.window // 2 + 1, dtype=complex)
+        self._max = deque()  # (index, value), values decreasing
+        self._min = deque()  # (index, value), values increasing
+
+    @property
+    def ready(self) -> bool:
+        """True once a full window has been observed"""
+        return self._filled >= self.window
+
+    def window_values(self) -> np.ndarray:
+        """Current window, oldest sample first"""
+        pos = self._count % self.window
+        return np.concatenate((self._ring[pos:], self._ring[:pos]))
+
+    def _powers(self, x):
+        d = x - self._ref
+        d2 = d * d
+        abs_x = np.abs(x)
+        return np.array([d, d2, d2 * d, d2 * d2, abs_x, np.sqrt(abs_x)])
+
+    def _resync(self):
+        values = self.window_values()
+        self._ref = float(values.mean())
+        self._sums = self._powers(values).sum(axis=1)
+        self._spectrum = np.fft.rfft(values)
+        self._since_resync = 0
+
+    def _track_extrema(self, index: int, value: float):
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+
+        expired = index - self.window
+        if self._max[0][0] <= expired:
+            self._max.popleft()
+        if self._min[0][0] <= expired:
+            self._min.popleft()
+
+    def push(self, value: float):
+        """Add one sample, evicting the oldest once the window is full"""
+        value = float(value)
+        pos = self._count % self.window
+        old = self._ring[pos]
+        was_full = self.ready
+
+        self._ring[pos] = value
+        self._track_extrema(self._count, value)
+        self._count += 1
+
+        if not was_full:
+            self._filled += 1
+            if self.ready:
+                self._resync()
+            return
+
+        self._sums += self._powers(value) - self._powers(old)
+        self._spectrum = (self._spectrum + (value - old)) * self._twiddle
+
+        self._since_resync += 1
+        if self._since_resync >= self.resync_interval:
+            self._resync()
+
+    def extend(self, values):
+        """Add a block of samples"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+
+        if len(values) >= self.window:
+            # Nothing of the current window survives: rebuild from the tail
+            start = self._count + len(values) - self.window
+            self.reset()
+            self._count = start
+            values = values[-self.window:]
+
+        for value in values:
+            self.push(value)
+
+    def _welch_psd(self) -> np.ndarray:
+        """One-segment Welch PSD (constant detrend, periodic Hann) from the sliding DFT"""
+        n = self.window
+        spectrum = self._spectrum.copy()
+        spectrum[0] = 0.0  # constant detrend only removes the DC bin
+
+        # Neighbouring bins for the Hann kernel, using X[-k] = conj(X[k])
+        last = len(spectrum) - 1
+        lower = np.concatenate(([np.conj(spectrum[1])], spectrum[:-1]))
+        upper = np.concatenate((spectrum[1:], [np.conj(spectrum[n - last - 1])]))
+
+        windowed = 0.5 * spectrum - 0.25 * (lower + upper)
+        return (windowed.real ** 2 + windowed.imag ** 2) * self._psd_scale
+
+    def features_array(self) -> np.ndarray:
+        """(1, 14) feature row in training column order"""
+        if not self.ready:
+            raise ValueError("Signal too short")
+
+        n = self.window
+        d1, d2, d3, d4, s_abs, s_sqrt_abs = self._sums / n
+
+        # Central moments from power sums about the reference; d1 (the mean's
+        # drift since the last resync) stays small, so nothing cancels
+        mean = self._ref + d1
+        m2 = max(d2 - d1 ** 2, 0.0)
+        m3 = d3 - 3 * d1 * d2 + 2 * d1 ** 3
+        m4 = d4 - 4 * d1 * d3 + 6 * d1 ** 2 * d2 - 3 * d1 ** 4
+
+        peak_max = self._max[0][1]
+        peak_min = self._min[0][1]
+
+        def col(v):
+            return np.array([v])
+
+        return assemble_features(
+            col(mean), col(m2), col(m3), col(m4), col(np.sqrt(m2 + mean ** 2)),
+            col(max(abs(peak_max), abs(peak_min))), col(peak_max - peak_min),
+            col(s_abs), col(s_sqrt_abs), self._freqs, self._welch_psd()[np.newaxis, :]
+        )
+
+    def features(self) -> Dict[str, float]:
+        """Feature dict matching `extract_features(window_values())`"""
+        return features_to_dict(self.features_array()[0])
+
+
+FRAME_ENCODINGS = ('json', 'base64')
+
+
+def format_sse(payload: Dict, event: Optional[str] = None) -> str:
+    """Serialize one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+
+def encode_frame(values: np.ndarray, t0: float, sample_rate: float,
+                 encoding: str = 'json') -> str:
+    """
+    Pack a block of samples into a single `frame` SSE event.
+
+    Sample i was taken at t0 + i / sample_rate. With encoding='base64' the
+    samples are sent as little-endian float32 bytes instead of JSON numbers.
+    """
+    payload = {
+        "t0": t0,
+        "sample_rate": sample_rate,
+        "count": int(len(values))
+    }
+
+    if encoding == 'base64':
+        payload["dtype"] = "float32"
+        payload["data"] = base64.b64encode(np.asarray(values, dtype='<f4').tobytes()).decode('ascii')
+    else:
+        payload["amplitudes"] = np.asarray(values, dtype=np.float64).tolist()
+
+    return format_sse(payload, event="frame")
@@ -0,0 +1,428 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import sys
+import time
+import warnings
+from urllib.parse import urlencode
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+
+warnings.filterwarnings('ignore')
+
+SAMPLE_DIR = os.path.join(BACKEND_DIR, 'synthetic_test_data')
+DEFAULT_MIX = 'predict=8,batch=1,spectrum=1'
+BATCH_SIGNALS = 8
+PERCENTILES = (50, 95, 99)
+# SSE delivery below this fraction of the stream rate counts as degraded
+MIN_SSE_DELIVERY = 0.95
+
+
+class ASGIClient:
+    """
+    Minimal HTTP client that calls an ASGI app directly, in this process.
+
+    Responses are read as the app sends them, so Server-Sent Event streams
+    can be consumed event by event; closing a stream sends http.disconnect
+    like a browser going away.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lifespan = None
+        self._lifespan_queue = None
+        self._lifespan_sent = None
+
+    async def start(self):
+        """Run the app's startup handlers"""
+        self._lifespan_queue, self._lifespan_sent = asyncio.Queue(), asyncio.Queue()
+        await self._lifespan_queue.put({'type': 'lifespan.startup'})
+        self._lifespan = asyncio.get_running_loop().create_task(self.app(
+            {'type': 'lifespan', 'asgi': {'version': '3.0'}}, self._lifespan_queue.get, self._lifespan_sent.put
+        ))
+        message = await self._lifespan_sent.get()
+        if message['type'] != 'lifespan.startup.complete':
+            raise RuntimeError(f"App startup failed: {message.get('message')}")
+
+    async def stop(self):
+        """Run the app's shutdown handlers"""
+        if self._lifespan is None:
+            return
+        await self._lifespan_queue.put({'type': 'lifespan.shutdown'})
+        await self._lifespan_sent.get()
+        await self._lifespan
+
+    def _scope(self, method, path, query, headers):
+        return {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': urlencode(query or {}).encode(), 'root_path': '',
+            'headers': [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80)
+        }
+
+    async def _open(self, method, path, query=None, headers=None, body=b''):
+        """(app task, queue of response messages, disconnect event)"""
+        disconnected = asyncio.Event()
+        messages = asyncio.Queue()
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        task = asyncio.get_running_loop().create_task(
+            self.app(self._scope(method, path, query, headers), receive, messages.put)
+        )
+        task.add_done_callback(lambda _: messages.put_nowait(None))
+        return task, messages, disconnected
+
+    async def request(self, method, path, query=None, headers=None, body=b''):
+        """(status, body bytes)"""
+        task, messages, disconnected = await self._open(method, path, query, headers, body)
+        status, chunks = 500, []
+        while True:
+            message = await messages.get()
+            if message is None:
+                break
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+                if not message.get('more_body', False):
+                    break
+        disconnected.set()
+        await task
+        return status, b''.join(chunks)
+
+    async def stream(self, path, query=None):
+        """Yield body chunks of a streaming GET until the caller stops iterating"""
+        task, messages, disconnected = await self._open('GET', path, query)
+        try:
+            while True:
+                message = await messages.get()
+                if message is None:
+                    break
+                if message['type'] == 'http.response.start' and message['status'] != 200:
+                    raise RuntimeError(f"GET {path} returned {message['status']}")
+                if message['type'] == 'http.response.body':
+                    yield message.get('body', b'')
+                    if not message.get('more_body', False):
+                        break
+        finally:
+            disconnected.set()
+            try:
+                await asyncio.wait_for(task, timeout=5.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                task.cancel()
+
+
+class HTTPClient:
+    """Same interface as ASGIClient for a server running elsewhere (e.g. local uvicorn)"""
+
+    def __init__(self, base_url):
+        import httpx
+        self.client = httpx.AsyncClient(base_url=base_url, timeout=None)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        await self.client.aclose()
+
+    async def request(self, method, path, query=None, headers=None, body=b''):
+        response = await self.client.request(method, path, params=query, headers=headers, content=body)
+        return response.status_code, response.content
+
+    async def stream(self, path, query=None):
+        async with self.client.stream('GET', path, params=query) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+            async for chunk in response.aiter_bytes():
+                yield chunk
+
+
+def load_samples(signal_size=None):
+    """Replayed synthetic_test_data/*.json SignalData bodies, optionally cut or tiled to signal_size"""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(SAMPLE_DIR, '*.json'))):
+        with open(path) as f:
+            data = json.load(f)
+        signal = np.asarray(data['signal'], dtype=np.float64)
+        if signal_size:
+            signal = np.resize(signal, signal_size)
+        samples.append({'signal': signal.tolist(), 'sampling_rate': data.get('sampling_rate', 12000)})
+    if not samples:
+        raise FileNotFoundError(f"No samples in {SAMPLE_DIR}")
+    return samples
+
+
+def build_requests(samples):
+    """{endpoint: callable(rng) -> (method, path, query, headers, body)} over the replayed samples"""
+    json_headers = {'content-type': 'application/json'}
+    bodies = [json.dumps(sample).encode() for sample in samples]
+
+    def one(path, query=None):
+        return lambda rng: ('POST', path, query, json_headers, bodies[rng.randrange(len(bodies))])
+
+    def batch(rng):
+        signals = [samples[rng.randrange(len(samples))] for _ in range(BATCH_SIGNALS)]
+        return 'POST', '/predict/batch', None, json_headers, json.dumps({'signals': signals}).encode()
+
+    return {
+        'predict': one('/predict'),
+        'batch': batch,
+        'spectrum': one('/spectrum'),
+        'recording': one('/predict/recording', {'window': 2400, 'hop': 1200}),
+        'report': one('/diagnostic-report')
+    }
+
+
+def parse_mix(text):
+    """'predict=8,batch=1' -> {'predict': 8.0, 'batch': 1.0}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def summarize(values_ms):
+    if not values_ms:
+        return {'count': 0}
+    values = np.asarray(values_ms)
+    summary = {'count': len(values)}
+    summary.update({f"p{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES})
+    summary['max_ms'] = float(values.max())
+    return summary
+
+
+def process_cpu_seconds(pid=None):
+    """User + system CPU time of this process, or of `pid` (Linux /proc) for an external server"""
+    if pid is None:
+        return time.process_time()
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+async def caller(client, requests, mix, rng, stop_at, latencies, errors):
+    """One closed-loop caller: send a request, wait for the response, repeat"""
+    names, weights = list(mix), list(mix.values())
+    loop = asyncio.get_running_loop()
+    while loop.time() < stop_at:
+        endpoint = rng.choices(names, weights)[0]
+        method, path, query, headers, body = requests[endpoint](rng)
+        start = time.perf_counter()
+        try:
+            status, _ = await client.request(method, path, query, headers, body)
+        except Exception as e:
+            status = f"{type(e).__name__}: {e}"
+        elapsed = (time.perf_counter() - start) * 1000
+        if status == 200:
+            latencies[endpoint].append(elapsed)
+        else:
+            errors[endpoint] = errors.get(endpoint, 0) + 1
+
+
+async def sse_subscriber(client, query, stop_at, lags, counts):
+    """
+    Read /stream-signal events until stop_at. A producer that falls behind
+    stamps its events late, so lag is measured against each sample's
+    scheduled time instead: first sample's arrival + sample index / rate.
+    """
+    loop = asyncio.get_running_loop()
+    rate = float(query['sample_rate'])
+    buffer = ''
+    anchor, delivered = None, 0
+    started = loop.time()
+    stream = client.stream('/stream-signal', query)
+    try:
+        async for chunk in stream:
+            received = time.time()
+            buffer += chunk.decode() if isinstance(chunk, bytes) else chunk
+            while '\n\n' in buffer:
+                event, buffer = buffer.split('\n\n', 1)
+                data = next((line[6:] for line in event.split('\n') if line.startswith('data: ')), None)
+                if data is None:
+                    continue
+                payload = json.loads(data)
+                counts['events'] += 1
+                if 'timestamp' in payload:
+                    n_samples = 1
+                elif 't0' in payload:
+                    n_samples = payload['count']
+                else:
+                    continue
+                if anchor is None:
+                    anchor = received
+                lags.append((received - (anchor + delivered / rate)) * 1000)
+                delivered += n_samples
+            if loop.time() >= stop_at:
+                break
+    finally:
+        counts['samples'] += delivered
+        counts['expected'] += (min(loop.time(), stop_at) - started) * rate
+        await stream.aclose()
+
+
+async def run_level(client, requests, mix, concurrency, subscribers, duration, stream_query, seed, server_pid):
+    """Drive one concurrency level for `duration` seconds; returns its report"""
+    loop = asyncio.get_running_loop()
+    latencies = {name: [] for name in mix}
+    errors = {}
+    lags, counts = [], {'events': 0, 'samples': 0, 'expected': 0.0}
+
+    cpu_start, wall_start = process_cpu_seconds(server_pid), time.perf_counter()
+    stop_at = loop.time() + duration
+    tasks = [
+        caller(client, requests, mix, random.Random(seed + i), stop_at, latencies, errors)
+        for i in range(concurrency)
+    ] + [
+        asyncio.wait_for(sse_subscriber(client, stream_query, stop_at, lags, counts), duration + 10)
+        for _ in range(subscribers)
+    ]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    wall = time.perf_counter() - wall_start
+    cpu = process_cpu_seconds(server_pid) - cpu_start
+
+    failures = [r for r in results if isinstance(r, Exception) and not isinstance(r, asyncio.TimeoutError)]
+    for failure in failures:
+        print(f"⚠️  Load task failed: {failure}")
+
+    completed = sum(len(values) for values in latencies.values())
+    return {
+        'concurrency': concurrency,
+        'subscribers': subscribers,
+        'duration_s': wall,
+        'requests': completed,
+        'errors': sum(errors.values()),
+        'throughput_rps': completed / wall,
+        'cpu_ms_per_request': cpu * 1000 / completed if completed else None,
+        'latency': summarize([v for values in latencies.values() for v in values]),
+        'endpoints': {
+            name: {**summarize(values), 'errors': errors.get(name, 0), 'throughput_rps': len(values) / wall}
+            for name, values in latencies.items()
+        },
+        'sse': {
+            **summarize(lags),
+            'events': counts['events'],
+            'samples_delivered': counts['samples'],
+            'samples_expected': int(counts['expected']),
+            'delivery_ratio': counts['samples'] / counts['expected'] if counts['expected'] else None
+        } if subscribers else None
+    }
+
+
+def print_level(report):
+    print(f"\n🔁 {report['concurrency']} caller(s), {report['subscribers']} SSE subscriber(s), "
+          f"{report['duration_s']:.1f}s: {report['requests']} requests, {report['errors']} errors, "
+          f"{report['throughput_rps']:.1f} req/s")
+    cpu = report['cpu_ms_per_request']
+    print(f"   CPU per request: {cpu:.2f} ms" if cpu is not None else "   CPU per request: n/a")
+    print(f"\n   {'Endpoint':<12}{'Requests':>10}{'Errors':>8}{'req/s':>9}"
+          + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES) + f"{'max ms':>10}")
+    rows = list(report['endpoints'].items()) + [('all', {**report['latency'], 'errors': report['errors'],
+                                                         'throughput_rps': report['throughput_rps']})]
+    for name, stats in rows:
+        if not stats['count']:
+            print(f"   {name:<12}{0:>10}{stats['errors']:>8}")
+            continue
+        print(f"   {name:<12}{stats['count']:>10}{stats['errors']:>8}{stats['throughput_rps']:>9.1f}"
+              + "".join(f"{stats[f'p{p}_ms']:>10.2f}" for p in PERCENTILES) + f"{stats['max_ms']:>10.2f}")
+    sse = report['sse']
+    if sse is not None:
+        ratio = sse['delivery_ratio'] or 0.0
+        print(f"\n   📡 SSE: {sse['events']} events, {sse['samples_delivered']} of {sse['samples_expected']} "
+              f"expected samples delivered ({ratio:.0%})")
+        if sse['count']:
+            print("      Lag behind schedule: "
+                  + ", ".join(f"p{p} {sse[f'p{p}_ms']:.1f}" for p in PERCENTILES) + f", max {sse['max_ms']:.1f} ms")
+        if ratio < MIN_SSE_DELIVERY:
+            print(f"   ⚠️  Stream degraded: below {MIN_SSE_DELIVERY:.0%} of the requested sample rate")
+
+
+async def main(args):
+    if args.url:
+        client = HTTPClient(args.url)
+    else:
+        from app.main import app
+        client = ASGIClient(app)
+
+    mix = parse_mix(args.mix)
+    samples = load_samples(args.signal_size)
+    requests = build_requests(samples)
+    unknown = set(mix) - set(requests)
+    if unknown:
+        raise SystemExit(f"Unknown endpoints in --mix: {sorted(unknown)}, expected {sorted(requests)}")
+    stream_query = {'mode': args.stream_mode, 'frame_size': args.frame_size, 'sample_rate': args.stream_rate}
+
+    await client.start()
+    try:
+        # One untimed request per endpoint loads the models and starts the pools
+        for name in mix:
+            method, path, query, headers, body = requests[name](random.Random(0))
+            status, body = await client.request(method, path, query, headers, body)
+            if status != 200:
+                raise SystemExit(f"Warm-up {path} returned {status}: {body[:200]!r}")
+
+        reports = []
+        for concurrency in args.concurrency:
+            report = await run_level(client, requests, mix, concurrency, args.subscribers, args.duration,
+                                     stream_query, args.seed, args.server_pid)
+            print_level(report)
+            reports.append(report)
+    finally:
+        await client.stop()
+
+    if len(reports) > 1:
+        print(f"\n📈 {'Callers':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'CPU ms/req':>12}{'SSE':>8}")
+        for report in reports:
+            latency = report['latency']
+            cpu = report['cpu_ms_per_request']
+            sse = report['sse']
+            delivery = f"{sse['delivery_ratio'] or 0.0:.0%}" if sse else '-'
+            print(f"   {report['concurrency']:>8}{report['throughput_rps']:>10.1f}"
+                  f"{latency.get('p50_ms', float('nan')):>10.2f}{latency.get('p99_ms', float('nan')):>10.2f}"
+                  f"{cpu if cpu is not None else float('nan'):>12.2f}{delivery:>8}")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'mix': mix, 'signal_size': args.signal_size, 'target': args.url or 'in-process',
+                       'levels': reports}, f, indent=2)
+        print(f"\n✅ Report saved to {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the API in-process or against a local server")
+    parser.add_argument('--url', help="Base URL of a running server (default: drive app.main:app in-process)")
+    parser.add_argument('--server-pid', type=int, help="With --url, measure CPU of this server process")
+    parser.add_argument('--concurrency', default='1,4,16',
+                        help="Comma-separated numbers of concurrent callers, one run each")
+    parser.add_argument('--subscribers', type=int, default=0, help="Concurrent /stream-signal subscribers")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help="Endpoint weights: predict, batch, spectrum, recording, report")
+    parser.add_argument('--signal-size', type=int, help="Cut or tile replayed signals to this many samples")
+    parser.add_argument('--stream-mode', default='real', choices=['real', 'random'])
+    parser.add_argument('--frame-size', type=int, default=1)
+    parser.add_argument('--stream-rate', type=float, default=20.0, help="Stream samples per second")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="Write the full report to this JSON file")
+    args = parser.parse_args()
+    args.concurrency = [int(n) for n in args.concurrency.split(',')]
+
+    print("=" * 80)
+    print(f"🚦 LOAD TEST ({args.url or 'in-process ASGI'})")
+    print("=" * 80)
+
+    asyncio.run(main(args))
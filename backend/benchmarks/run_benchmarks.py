@@ -0,0 +1,243 @@
+import argparse
+import contextlib
+import glob
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+from datetime import datetime
+import joblib
+import numpy as np
+import scipy
+import sklearn
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+from app.compiled_forest import compile_model
+from app.dataset_cache import RecordingCache
+from app.features import extract_features, model_feature_names
+from app.prediction import FaultPredictor
+from app.preprocessing import SignalProcessor
+from app.report_generator import ReportGenerator
+
+warnings.filterwarnings('ignore')
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baselines', 'baseline.json')
+CWRU_DATA_DIR = os.path.join(BACKEND_DIR, '..', 'data', 'cwru_dataset')
+CSV_DIR = os.path.join(BACKEND_DIR, 'csv_test_files')
+SERVING_MODEL_PATH = os.path.join(BACKEND_DIR, 'models', 'rf_model_real.pkl')
+LEGACY_MODEL_PATH = os.path.join(BACKEND_DIR, 'ml_models', 'random_forest_model.pkl')
+LEGACY_SCALER_PATH = os.path.join(BACKEND_DIR, 'ml_models', 'scaler.pkl')
+
+SAMPLING_RATE = 12000
+# CWRU recordings are cut (or tiled, past their ~120k-240k samples) to these lengths
+SIGNAL_LENGTHS = [100, 1000, 2400, 12000, 120000, 480000]
+BENCHMARKS = [
+    'extract_features',
+    'SignalProcessor.extract_all_features',
+    'FaultPredictor.predict',
+    'model.predict_proba',
+    'ReportGenerator.generate_pdf'
+]
+
+# Each case repeats until TIME_BUDGET seconds have passed, within these bounds
+MIN_REPEATS = 3
+MAX_REPEATS = 200
+TIME_BUDGET = 0.5
+
+
+def load_signals(sources, lengths):
+    """[(source, signal)] from the CWRU recordings at every length and the CSV test files as stored"""
+    signals = []
+    if 'cwru' in sources:
+        recordings = RecordingCache(os.path.join(CWRU_DATA_DIR, '.cache'))
+        for path in sorted(glob.glob(os.path.join(CWRU_DATA_DIR, '*.mat'))):
+            channel = np.asarray(recordings.get_channel(path))
+            name = os.path.splitext(os.path.basename(path))[0]
+            for n in lengths:
+                signals.append((f"cwru/{name}", np.resize(channel, n)))
+    if 'csv' in sources:
+        for path in sorted(glob.glob(os.path.join(CSV_DIR, '*.csv'))):
+            name = os.path.splitext(os.path.basename(path))[0]
+            signals.append((f"csv/{name}", np.loadtxt(path, delimiter=',', ndmin=1)))
+    return signals
+
+
+def time_call(fn):
+    """Per-call times (ms) of fn() after one warm-up call; its console output is discarded"""
+    samples = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        fn()
+        deadline = time.perf_counter() + TIME_BUDGET
+        while len(samples) < MIN_REPEATS or (len(samples) < MAX_REPEATS and time.perf_counter() < deadline):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+    return np.array(samples)
+
+
+def benchmark_cases(signal, model, names, predictor, generator):
+    """{benchmark: zero-argument call} for one signal"""
+    features = extract_features(signal, SAMPLING_RATE, names)
+    row = np.array(list(features.values())).reshape(1, -1)
+    probabilities = model.predict_proba(row)[0]
+    prob_dict = {str(c): float(p) for c, p in zip(model.classes_, probabilities)}
+    legacy_features = SignalProcessor.extract_all_features(signal, SAMPLING_RATE)
+    prediction = str(model.classes_[np.argmax(probabilities)])
+
+    return {
+        'extract_features': lambda: extract_features(signal, SAMPLING_RATE, names),
+        'SignalProcessor.extract_all_features': lambda: SignalProcessor.extract_all_features(signal, SAMPLING_RATE),
+        'FaultPredictor.predict': lambda: predictor.predict(legacy_features),
+        'model.predict_proba': lambda: model.predict_proba(row),
+        'ReportGenerator.generate_pdf': lambda: generator.generate_pdf(
+            signal, SAMPLING_RATE, features, prediction, float(np.max(probabilities)), prob_dict
+        )
+    }
+
+
+def run(sources=('cwru', 'csv'), lengths=SIGNAL_LENGTHS, benchmarks=BENCHMARKS, backend='compiled'):
+    """Time every benchmark on every signal; returns the results document"""
+    model = compile_model(joblib.load(SERVING_MODEL_PATH), backend, check_rows=None)
+    names = model_feature_names(model)
+    predictor = FaultPredictor(LEGACY_MODEL_PATH, LEGACY_SCALER_PATH, backend=backend)
+    generator = ReportGenerator()
+
+    results = []
+    for source, signal in load_signals(sources, lengths):
+        cases = benchmark_cases(signal, model, names, predictor, generator)
+        for benchmark in benchmarks:
+            samples = time_call(cases[benchmark])
+            median = float(np.median(samples))
+            results.append({
+                'benchmark': benchmark,
+                'source': source,
+                'samples': len(signal),
+                'repeats': len(samples),
+                'median_ms': median,
+                'p90_ms': float(np.percentile(samples, 90)),
+                'min_ms': float(samples.min()),
+                'ns_per_sample': median * 1e6 / len(signal)
+            })
+            print(f"  {benchmark:<38}{source:<26}{len(signal):>8}{median:>12.3f} ms"
+                  f"{median * 1e6 / len(signal):>12.1f} ns/sample")
+
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'sklearn': sklearn.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'model_backend': backend,
+            'sampling_rate': SAMPLING_RATE
+        },
+        'results': results
+    }
+
+
+def compare(baseline, current, threshold=0.2, min_delta_ms=0.05, metric='median_ms'):
+    """
+    Rows of (key, baseline ms, current ms, ratio, status) for cases present in
+    both documents. A case regresses when its `metric` is more than
+    `threshold` slower and at least `min_delta_ms` slower (so microsecond
+    calls do not flag on timer noise).
+    """
+    previous = {(r['benchmark'], r['source'], r['samples']): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        key = (result['benchmark'], result['source'], result['samples'])
+        if key not in previous:
+            continue
+        old, new = previous[key][metric], result[metric]
+        ratio = new / old if old > 0 else float('inf')
+        if ratio > 1 + threshold and new - old >= min_delta_ms:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold) and old - new >= min_delta_ms:
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append((key, old, new, ratio, status))
+    return rows
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(document, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+        f.write('\n')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serving benchmarks with JSON baselines")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Time the benchmarks and save the results")
+    run_parser.add_argument('--out', default=DEFAULT_BASELINE)
+
+    compare_parser = commands.add_parser('compare', help="Compare results with a baseline")
+    compare_parser.add_argument('current', nargs='?',
+                                help="Results file to check (default: run the benchmarks now)")
+    compare_parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    compare_parser.add_argument('--threshold', type=float, default=0.2,
+                                help="Allowed slowdown of the median, as a fraction")
+    compare_parser.add_argument('--min-delta-ms', type=float, default=0.05)
+    compare_parser.add_argument('--metric', default='median_ms', choices=['median_ms', 'min_ms', 'p90_ms'],
+                                help="min_ms is steadier on a busy machine")
+    compare_parser.add_argument('--out', help="Also save freshly run results here")
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument('--sources', default='cwru,csv')
+        sub.add_argument('--lengths', default=','.join(map(str, SIGNAL_LENGTHS)))
+        sub.add_argument('--benchmarks', default=','.join(BENCHMARKS))
+        sub.add_argument('--backend', default='compiled', choices=['sklearn', 'compiled'])
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("⏱️  SERVING BENCHMARKS")
+    print("=" * 80)
+
+    def run_now():
+        return run(sources=args.sources.split(','),
+                   lengths=[int(n) for n in args.lengths.split(',')],
+                   benchmarks=args.benchmarks.split(','),
+                   backend=args.backend)
+
+    if args.command == 'run':
+        document = run_now()
+        save_results(document, args.out)
+        print(f"\n✅ {len(document['results'])} results saved to {args.out}")
+        sys.exit(0)
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.current) if args.current else run_now()
+    if args.out:
+        save_results(current, args.out)
+
+    rows = compare(baseline, current, args.threshold, args.min_delta_ms, args.metric)
+    print(f"\n📊 {args.baseline} ({baseline['meta']['created']}) vs "
+          f"{args.current or 'this run'} ({current['meta']['created']}), {args.metric} threshold +{args.threshold:.0%}")
+    print(f"\n{'Benchmark':<38}{'Source':<26}{'Samples':>8}{'Base ms':>11}{'Now ms':>11}{'Ratio':>8}")
+    print("-" * 102)
+    icons = {'regression': '❌', 'improvement': '⚡', 'ok': '  '}
+    for (benchmark, source, samples), old, new, ratio, status in rows:
+        print(f"{benchmark:<38}{source:<26}{samples:>8}{old:>11.3f}{new:>11.3f}{ratio:>7.2f}x {icons[status]}")
+
+    regressions = [row for row in rows if row[4] == 'regression']
+    improvements = [row for row in rows if row[4] == 'improvement']
+    print(f"\n{len(rows)} cases compared, {len(regressions)} regressions, {len(improvements)} improvements")
+    if regressions:
+        print("❌ Performance regressed beyond the threshold")
+        sys.exit(1)
+    print("✅ No regressions")
@@ -1,42 +1,11 @@
 import json
 import numpy as np
 import joblib
-from scipy import stats
-from scipy.signal import welch
+from app.features import extract_features_many
 
 # Load model
 model = joblib.load('models/rf_model_real.pkl')
 
-def extract_features(signal):
-    """Extract features (same as in main.py)"""
-    signal = np.array(signal)
-    
-    mean = np.mean(signal)
-    std = np.std(signal)
-    rms = np.sqrt(np.mean(signal**2))
-    peak = np.max(np.abs(signal))
-    peak_to_peak = np.ptp(signal)
-    crest_factor = peak / rms if rms > 0 else 0
-    skewness = stats.skew(signal)
-    kurtosis = stats.kurtosis(signal)
-    
-    sqrt_abs_signal = np.sqrt(np.abs(signal))
-    sqrt_abs_mean = np.mean(sqrt_abs_signal)
-    clearance_factor = peak / (sqrt_abs_mean**2) if sqrt_abs_mean > 0 else 0
-    
-    abs_mean = np.mean(np.abs(signal))
-    shape_factor = rms / abs_mean if abs_mean > 0 else 0
-    impulse_factor = peak / abs_mean if abs_mean > 0 else 0
-    
-    freqs, psd = welch(signal, fs=12000, nperseg=min(1024, len(signal)))
-    freq_mean = np.sum(freqs * psd) / np.sum(psd) if np.sum(psd) > 0 else 0
-    freq_std = np.sqrt(np.sum(((freqs - freq_mean)**2) * psd) / np.sum(psd)) if np.sum(psd) > 0 else 0
-    freq_peak = freqs[np.argmax(psd)]
-    
-    return np.array([mean, std, rms, peak, peak_to_peak, crest_factor, 
-                     skewness, kurtosis, clearance_factor, shape_factor, 
-                     impulse_factor, freq_mean, freq_std, freq_peak])
-
 def test_dataset(json_file):
     """Test model on synthetic dataset"""
     
@@ -52,20 +21,13 @@ def test_dataset(json_file):
     total_samples = 0
     
     for fault_type, signals in data['data'].items():
-        correct = 0
-        predictions = []
-        confidences = []
+        # One batched feature pass and one model call per fault type
+        features = extract_features_many(signals)
+        probabilities = model.predict_proba(features)
+        predictions = model.classes_[np.argmax(probabilities, axis=1)]
+        confidences = probabilities.max(axis=1)
         
-        for signal in signals:
-            features = extract_features(signal).reshape(1, -1)
-            prediction = model.predict(features)[0]
-            confidence = model.predict_proba(features)[0].max()
-            
-            predictions.append(prediction)
-            confidences.append(confidence)
-            
-            if prediction == fault_type:
-                correct += 1
+        correct = int(np.sum(predictions == fault_type))
         
         accuracy = (correct / len(signals)) * 100
         avg_confidence = np.mean(confidences)
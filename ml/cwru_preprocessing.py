@@ -8,6 +8,10 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
 
+# Spectra come from the serving app's spectral engine
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.spectral import Spectrum
+
 warnings.filterwarnings('ignore')
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
@@ -44,11 +48,12 @@ def preprocess(raw, fs):
 
 def compute_fft(sig, fs):
     n = len(sig)
-    freqs = np.fft.fftfreq(n, d=1/fs)[:n//2]
-    fft_vals = np.abs(np.fft.fft(sig)[:n//2])
+    spectrum = Spectrum(sig, fs, nperseg=1024)
+    freqs = spectrum.freqs[:n//2]
+    fft_vals = spectrum.magnitude[0, :n//2]
     fft_vals = fft_vals / (np.max(fft_vals) + 1e-10)
-    freqs_psd, psd = signal.welch(sig, fs=fs, nperseg=1024)
-    return freqs, fft_vals, freqs_psd, psd
+    freqs_psd, psd = spectrum.welch
+    return freqs, fft_vals, freqs_psd, psd[0]
 
 def extract_features(sig, freqs, fft_vals, freqs_psd, psd):
     f = {}
@@ -1,41 +1,20 @@
+import os
+import sys
 import numpy as np
 import joblib
 from scipy.io import loadmat
-from scipy import stats
-from scipy.signal import welch
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.features import extract_features_batch
+
+COMPARED_FEATURES = ['rms', 'kurtosis', 'crest_factor', 'freq_peak']
+
 def extract_features(signal):
-    """Extract features"""
-    signal = np.array(signal)
-    
-    mean = np.mean(signal)
-    std = np.std(signal)
-    rms = np.sqrt(np.mean(signal**2))
-    peak = np.max(np.abs(signal))
-    peak_to_peak = np.ptp(signal)
-    crest_factor = peak / rms if rms > 0 else 0
-    skewness = stats.skew(signal)
-    kurtosis = stats.kurtosis(signal)
-    
-    sqrt_abs_mean = np.mean(np.sqrt(np.abs(signal)))
-    clearance_factor = peak / (sqrt_abs_mean**2) if sqrt_abs_mean > 0 else 0
-    
-    abs_mean = np.mean(np.abs(signal))
-    shape_factor = rms / abs_mean if abs_mean > 0 else 0
-    impulse_factor = peak / abs_mean if abs_mean > 0 else 0
-    
-    freqs, psd = welch(signal, fs=12000, nperseg=1024)
-    freq_mean = np.sum(freqs * psd) / np.sum(psd)
-    freq_std = np.sqrt(np.sum(((freqs - freq_mean)**2) * psd) / np.sum(psd))
-    freq_peak = freqs[np.argmax(psd)]
+    """Extract only the compared features"""
+    row = extract_features_batch(signal, names=COMPARED_FEATURES)[0]
     
-    return {
-        'rms': rms,
-        'kurtosis': kurtosis,
-        'crest_factor': crest_factor,
-        'freq_peak': freq_peak
-    }
+    return dict(zip(COMPARED_FEATURES, row))
 
 print("="*70)
 print("FEATURE COMPARISON ACROSS FAULT TYPES")
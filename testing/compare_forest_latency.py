@@ -0,0 +1,63 @@
+import joblib
+import os
+import sys
+import time
+import warnings
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.compiled_forest import CompiledForest
+
+warnings.filterwarnings('ignore')
+
+MODEL_PATH = './backend/models/rf_model_real.pkl'
+BATCH_SIZES = [1, 8, 64, 512]
+
+
+def time_call(fn, X, repeats):
+    """Median and p99 latency of fn(X) in milliseconds"""
+    fn(X)  # warm-up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        samples.append((time.perf_counter() - start) * 1000)
+    return np.median(samples), np.percentile(samples, 99)
+
+
+print("=" * 80)
+print("⚡ RANDOM FOREST LATENCY: sklearn vs compiled arrays")
+print("=" * 80)
+
+model = joblib.load(MODEL_PATH)
+start = time.perf_counter()
+compiled = CompiledForest.from_sklearn(model)
+print(f"\n📦 {MODEL_PATH}: {len(model.estimators_)} trees, {len(compiled.feature)} nodes, "
+      f"depth {compiled.depth} (compiled in {(time.perf_counter() - start) * 1000:.1f} ms)")
+
+rng = np.random.default_rng(42)
+X_check = rng.normal(scale=10.0, size=(10000, model.n_features_in_))
+
+sequential = joblib.load(MODEL_PATH)
+sequential.set_params(n_jobs=1)
+identical = np.array_equal(compiled.predict_proba(X_check), sequential.predict_proba(X_check))
+print(f"{'✅' if identical else '❌'} predict_proba bit-identical on {len(X_check)} rows: {identical}")
+
+backends = [
+    (f"sklearn (n_jobs={model.n_jobs})", model.predict_proba),
+    ("sklearn (n_jobs=1)", sequential.predict_proba),
+    ("compiled", compiled.predict_proba),
+]
+
+print(f"\n{'Backend':<22}" + "".join(f"{f'batch={n}':>20}" for n in BATCH_SIZES))
+print(f"{'':<22}" + "".join(f"{'median / p99 ms':>20}" for _ in BATCH_SIZES))
+print("-" * (22 + 20 * len(BATCH_SIZES)))
+
+for name, fn in backends:
+    cells = []
+    for n in BATCH_SIZES:
+        median, p99 = time_call(fn, X_check[:n], repeats=200 if n <= 64 else 50)
+        cells.append(f"{median:8.3f} / {p99:7.3f}")
+    print(f"{name:<22}" + "".join(f"{cell:>20}" for cell in cells))
+
+print("\n" + "=" * 80)
@@ -0,0 +1,180 @@
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.dataset_cache import RecordingCache
+from app.features import FEATURE_FS, FEATURE_NAMES, FEATURE_SET_VERSION, extract_features_batch
+from app.segmentation import hop_length, segment_count, strided_segments
+
+# CWRU file name prefix -> class label (normal_0.mat, inner_007_2.mat, ...)
+FAULT_LABELS = {
+    'normal': 'normal',
+    'ball': 'ball',
+    'inner': 'inner_race',
+    'outer': 'outer_race'
+}
+
+_worker_recordings = None
+
+
+def cwru_files(data_dir):
+    """{file name: label} for every recognised CWRU .mat file in data_dir, in FAULT_LABELS order"""
+    prefixes = list(FAULT_LABELS)
+    found = []
+    for path in glob.glob(os.path.join(data_dir, '*.mat')):
+        filename = os.path.basename(path)
+        prefix = filename.split('_')[0]
+        if prefix in FAULT_LABELS:
+            found.append((prefixes.index(prefix), filename))
+    return {filename: FAULT_LABELS[filename.split('_')[0]] for _, filename in sorted(found)}
+
+
+def file_hash(path):
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _init_worker(recording_dir):
+    global _worker_recordings
+    _worker_recordings = RecordingCache(recording_dir)
+
+
+def _count_segments(mat_path, segment_length, step):
+    """Decode a recording (once, into the shared .npy cache) and count its segments"""
+    return segment_count(len(_worker_recordings.get_channel(mat_path)), segment_length, step)
+
+
+def _extract_chunk(mat_path, first, last, segment_length, step, feature_names):
+    """Feature rows for segments [first, last) of a recording"""
+    # Strided view over the memory-mapped channel; only this chunk is read
+    segments = strided_segments(_worker_recordings.get_channel(mat_path), segment_length, step)
+    return extract_features_batch(segments[first:last], names=feature_names)
+
+
+class DatasetBuilder:
+    """
+    Builds the training matrix from CWRU recordings with a per-file feature cache.
+
+    Each file's features are stored in `cache_dir` as an .npz keyed by the
+    file's sha256, the segment length, the overlap, the feature names and
+    FEATURE_SET_VERSION, so a rebuild only recomputes files whose content or
+    settings changed. Missing files fan out over a process pool: one decode
+    task per file, then one task per `chunk_segments` segments. Decoded
+    channels are shared between workers through the RecordingCache .npy files.
+    """
+
+    def __init__(self, data_dir, cache_dir=None, segment_length=2400, overlap=0.5,
+                 feature_names=FEATURE_NAMES, workers=None, chunk_segments=512):
+        self.data_dir = data_dir
+        self.cache_dir = cache_dir or os.path.join(data_dir, '.features')
+        self.recording_dir = os.path.join(data_dir, '.cache')
+        self.segment_length = segment_length
+        self.overlap = overlap
+        self.step = hop_length(segment_length, overlap)
+        self.feature_names = list(feature_names)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_segments = chunk_segments
+
+    def cache_key(self, source_hash):
+        """Feature cache key for one source file under the current settings"""
+        settings = json.dumps({
+            'source': source_hash,
+            'segment_length': self.segment_length,
+            'overlap': self.overlap,
+            'features': self.feature_names,
+            'feature_set_version': FEATURE_SET_VERSION,
+            'fs': FEATURE_FS
+        }, sort_keys=True)
+        return hashlib.sha256(settings.encode()).hexdigest()[:16]
+
+    def cache_path(self, filename, key):
+        return os.path.join(self.cache_dir, f"{os.path.splitext(filename)[0]}.{key}.npz")
+
+    def _load_cached(self, path):
+        try:
+            with np.load(path) as cached:
+                return cached['X']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, path, X):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write-then-rename so an interrupted build never leaves a partial entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, X=X, feature_names=np.array(self.feature_names))
+        os.replace(tmp_path, path)
+
+    def _compute(self, missing):
+        """{filename: X} for files not in the cache, computed on the process pool"""
+        chunks = {filename: {} for filename in missing}
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(self.recording_dir,)) as pool:
+            counts = {
+                pool.submit(_count_segments, path, self.segment_length, self.step): filename
+                for filename, path in missing.items()
+            }
+            extracts = {}
+            for future in as_completed(counts):
+                filename = counts[future]
+                n_segments = future.result()
+                print(f"  {filename}: {n_segments} segments")
+                for first in range(0, n_segments, self.chunk_segments):
+                    last = min(first + self.chunk_segments, n_segments)
+                    extract = pool.submit(_extract_chunk, missing[filename], first, last,
+                                          self.segment_length, self.step, self.feature_names)
+                    extracts[extract] = (filename, first)
+
+            for future in as_completed(extracts):
+                filename, first = extracts[future]
+                chunks[filename][first] = future.result()
+
+        empty = np.empty((0, len(self.feature_names)))
+        return {
+            filename: np.vstack([parts[first] for first in sorted(parts)]) if parts else empty
+            for filename, parts in chunks.items()
+        }
+
+    def build(self, files):
+        """(X, y) for {file name: label}, rows in file order then segment order"""
+        entries, features, missing = {}, {}, {}
+        for filename in files:
+            path = os.path.join(self.data_dir, filename)
+            if not os.path.exists(path):
+                print(f"⚠️  {filename} not found, skipping...")
+                continue
+            entries[filename] = self.cache_path(filename, self.cache_key(file_hash(path)))
+            X = self._load_cached(entries[filename])
+            if X is None:
+                missing[filename] = path
+            else:
+                features[filename] = X
+                print(f"♻️  {filename}: {len(X)} segments from cache")
+
+        if missing:
+            print(f"Extracting features for {len(missing)} file(s) on {self.workers} worker(s)...")
+            start = time.perf_counter()
+            computed = self._compute(missing)
+            n_rows = sum(len(X) for X in computed.values())
+            print(f"  {n_rows} segments in {time.perf_counter() - start:.2f}s")
+            for filename, X in computed.items():
+                self._save(entries[filename], X)
+            features.update(computed)
+
+        if not entries:
+            return np.empty((0, len(self.feature_names))), np.array([])
+        X = np.vstack([features[filename] for filename in entries])
+        y = np.concatenate([[files[filename]] * len(features[filename]) for filename in entries])
+        return X, y
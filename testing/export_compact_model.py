@@ -0,0 +1,115 @@
+import argparse
+import gc
+import io
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.compiled_forest import LEAF_DTYPES, CompiledForest, compile_model, prediction_drift
+from app.features import AVAILABLE_FEATURES, model_feature_names
+from train_real_model import prepare_dataset
+
+warnings.filterwarnings('ignore')
+
+LOAD_REPEATS = 20
+
+
+def measure_load(load, payload):
+    """Median load time (ms) and memory retained by the loaded model (bytes)"""
+    times = []
+    for _ in range(LOAD_REPEATS):
+        start = time.perf_counter()
+        load(io.BytesIO(payload))
+        times.append((time.perf_counter() - start) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    model = load(io.BytesIO(payload))
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del model
+    return float(np.median(times)), retained
+
+
+def validation_rows(model):
+    """(X, y) of real CWRU rows for the model's features, or random probe rows and no labels"""
+    try:
+        names = model_feature_names(model)
+    except ValueError:
+        names = None
+    if names is not None and all(name in AVAILABLE_FEATURES for name in names):
+        X, y, _ = prepare_dataset(feature_names=names)
+        labels_match = set(np.unique(y)) <= set(model.classes_.tolist())
+        return X, (y if labels_match else None)
+    print("⚠️  Model features unknown, validating on random probe rows only")
+    return np.random.default_rng(0).normal(scale=10.0, size=(2000, model.n_features_in_)), None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a pickled random forest to the compact .npz format")
+    parser.add_argument('model', nargs='?', default='backend/models/rf_model_real.pkl')
+    parser.add_argument('--out', help="Output path (default: <model>_compact.npz next to the pickle)")
+    parser.add_argument('--leaf-dtype', default='uint16', choices=LEAF_DTYPES)
+    parser.add_argument('--max-depth', type=int, help="Cut every tree at this depth")
+    parser.add_argument('--n-estimators', type=int, help="Keep only the first N trees")
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.005,
+                        help="Refuse to export if accuracy (or agreement) drops by more than this")
+    args = parser.parse_args()
+    out = args.out or f"{os.path.splitext(args.model)[0]}_compact.npz"
+
+    print("=" * 80)
+    print("📦 COMPACT FOREST EXPORT")
+    print("=" * 80)
+
+    with open(args.model, 'rb') as f:
+        pickle_payload = f.read()
+    model = joblib.load(io.BytesIO(pickle_payload))
+    model.set_params(n_jobs=1)
+
+    forest = CompiledForest.from_sklearn(model).prune(args.max_depth, args.n_estimators)
+    buffer = io.BytesIO()
+    forest.save_compact(buffer, leaf_dtype=args.leaf_dtype)
+    compact_payload = buffer.getvalue()
+    compact = CompiledForest.load_compact(io.BytesIO(compact_payload))
+
+    print(f"\n🌲 {args.model}: {len(model.estimators_)} trees -> {compact.n_estimators} trees, "
+          f"{len(compact.feature)} nodes, depth {compact.depth}, {args.leaf_dtype} leaves")
+
+    # Accuracy drift against the pickled forest
+    X, y = validation_rows(model)
+    drift = prediction_drift(model, compact, X, y)
+    print(f"\n🎯 Drift on {drift['rows']} rows: max |Δp| {drift['max_proba_diff']:.2e}, "
+          f"label agreement {drift['label_agreement']:.4f}")
+    if y is not None:
+        print(f"   Accuracy: pickle {drift['reference_accuracy']:.4f} -> compact {drift['candidate_accuracy']:.4f}")
+        drop = drift['reference_accuracy'] - drift['candidate_accuracy']
+    else:
+        drop = 1.0 - drift['label_agreement']
+
+    # Load time and retained memory, as the registry loads each form
+    pickle_ms, pickle_bytes = measure_load(
+        lambda f: compile_model(joblib.load(f), 'compiled', check_rows=None), pickle_payload
+    )
+    raw_ms, raw_bytes = measure_load(joblib.load, pickle_payload)
+    compact_ms, compact_bytes = measure_load(CompiledForest.load_compact, compact_payload)
+
+    print(f"\n{'Format':<28}{'File KB':>10}{'Load ms':>10}{'Memory KB':>12}")
+    print("-" * 60)
+    print(f"{'pickle (sklearn)':<28}{len(pickle_payload) / 1024:>10.1f}{raw_ms:>10.2f}{raw_bytes / 1024:>12.1f}")
+    print(f"{'pickle -> compiled':<28}{len(pickle_payload) / 1024:>10.1f}{pickle_ms:>10.2f}{pickle_bytes / 1024:>12.1f}")
+    print(f"{'compact .npz':<28}{len(compact_payload) / 1024:>10.1f}{compact_ms:>10.2f}{compact_bytes / 1024:>12.1f}")
+
+    if drop > args.max_accuracy_drop:
+        print(f"\n❌ Accuracy drop {drop:.4f} exceeds {args.max_accuracy_drop}; not exported")
+        sys.exit(1)
+
+    with open(out, 'wb') as f:
+        f.write(compact_payload)
+    print(f"\n✅ Compact model saved to {out}")
@@ -0,0 +1,79 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import joblib
+import numpy as np
+import httpx
+from sklearn.ensemble import RandomForestClassifier
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
+# Hold every row in the inference queue long enough to swap the model under it
+os.environ['INFERENCE_MAX_WAIT_MS'] = '500'
+
+from app import main
+from app.features import FEATURE_NAMES
+
+print("=" * 60)
+print("TESTING MODEL HOT SWAP DURING IN-FLIGHT REQUESTS")
+print("=" * 60)
+
+
+def pruned_model(classes):
+    """Small forest on the first five features only, like a pruned retrain"""
+    names = FEATURE_NAMES[:5]
+    rng = np.random.default_rng(0)
+    model = RandomForestClassifier(n_estimators=5, random_state=0)
+    model.fit(rng.normal(size=(200, len(names))), rng.choice(classes, size=200))
+    model.feature_names_ = list(names)
+    return model
+
+
+async def run_checks():
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, f"{main.SERVING_MODEL}.pkl")
+    shutil.copy(main.registry.paths[main.SERVING_MODEL], path)
+    main.registry.paths[main.SERVING_MODEL] = path
+    old = await asyncio.to_thread(main.serving_model)
+
+    signal = main.load_real_signal_segment('fault/ball')
+    transport = httpx.ASGITransport(app=main.app)
+    failures = 0
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            # 1. Request queued on the old version, model swapped, second request on the new one
+            in_flight = asyncio.create_task(client.post('/predict', json={'signal': signal}))
+            await asyncio.sleep(0.2)
+            joblib.dump(pruned_model(old.model.classes_), path)
+            swapped = await main.registry.reload(main.SERVING_MODEL)
+            after = await client.post('/predict', json={'signal': signal})
+            before = await in_flight
+
+            new_version = swapped['active']['version']
+            print(f"\n1. Swap v{old.version} -> v{new_version} while /predict is queued:")
+            ok = before.status_code == 200 and list(before.json()['features']) == main.serving_features(old)
+            failures += not ok
+            print(f"   {'✅' if ok else '❌'} in-flight request: status {before.status_code}, "
+                  f"{len(before.json().get('features', {}))} features (old model)")
+            ok = after.status_code == 200 and list(after.json()['features']) == FEATURE_NAMES[:5]
+            failures += not ok
+            print(f"   {'✅' if ok else '❌'} new request: status {after.status_code}, "
+                  f"{len(after.json().get('features', {}))} features (new model)")
+
+            # 2. Both requests were queued together but scored in separate batches
+            flushes = main.inference.stats()['flushes']
+            ok = swapped['swapped'] and flushes >= 2
+            failures += not ok
+            print(f"   {'✅' if ok else '❌'} {flushes} scheduler flushes, one per model version")
+    finally:
+        shutil.rmtree(workdir)
+    return failures
+
+
+if __name__ == "__main__":
+    failures = asyncio.run(asyncio.wait_for(run_checks(), timeout=120))
+    print(f"\n{'✅ All checks passed' if not failures else f'❌ {failures} check(s) failed'}")
+    sys.exit(1 if failures else 0)
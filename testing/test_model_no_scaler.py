@@ -1,42 +1,10 @@
+import os
+import sys
 import joblib
 import numpy as np
-from scipy import stats
-from scipy.signal import welch
 
-def extract_features(signal):
-    """Extract features exactly as training"""
-    signal = np.array(signal)
-    features = {}
-    
-    features['mean'] = float(np.mean(signal))
-    features['std'] = float(np.std(signal))
-    features['rms'] = float(np.sqrt(np.mean(signal**2)))
-    features['peak'] = float(np.max(np.abs(signal)))
-    features['peak_to_peak'] = float(np.ptp(signal))
-    features['crest_factor'] = float(features['peak'] / features['rms']) if features['rms'] != 0 else 0
-    features['skewness'] = float(stats.skew(signal))
-    features['kurtosis'] = float(stats.kurtosis(signal))
-    
-    sqrt_abs_mean = np.mean(np.sqrt(np.abs(signal)))
-    features['clearance_factor'] = float(features['peak'] / (sqrt_abs_mean**2)) if sqrt_abs_mean != 0 else 0
-    
-    mean_abs = np.mean(np.abs(signal))
-    features['shape_factor'] = float(features['rms'] / mean_abs) if mean_abs != 0 else 0
-    features['impulse_factor'] = float(features['peak'] / mean_abs) if mean_abs != 0 else 0
-    
-    freqs, psd = welch(signal, fs=12000, nperseg=1024)
-    psd_sum = np.sum(psd)
-    
-    if psd_sum != 0:
-        features['freq_mean'] = float(np.sum(freqs * psd) / psd_sum)
-        features['freq_std'] = float(np.sqrt(np.sum(((freqs - features['freq_mean'])**2) * psd) / psd_sum))
-    else:
-        features['freq_mean'] = 0.0
-        features['freq_std'] = 0.0
-    
-    features['freq_peak'] = float(freqs[np.argmax(psd)])
-    
-    return features
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.features import extract_features
 
 print("=" * 80)
 print("🧪 TESTING rf_model_real.pkl WITHOUT SCALER")
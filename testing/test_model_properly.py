@@ -1,37 +1,15 @@
+import os
+import sys
 import numpy as np
 import joblib
 from scipy.io import loadmat
-from scipy import stats
-from scipy.signal import welch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.features import extract_features_batch
 
 def extract_features(signal):
-    """Extract features"""
-    signal = np.array(signal)
-    
-    mean = np.mean(signal)
-    std = np.std(signal)
-    rms = np.sqrt(np.mean(signal**2))
-    peak = np.max(np.abs(signal))
-    peak_to_peak = np.ptp(signal)
-    crest_factor = peak / rms if rms > 0 else 0
-    skewness = stats.skew(signal)
-    kurtosis = stats.kurtosis(signal)
-    
-    sqrt_abs_mean = np.mean(np.sqrt(np.abs(signal)))
-    clearance_factor = peak / (sqrt_abs_mean**2) if sqrt_abs_mean > 0 else 0
-    
-    abs_mean = np.mean(np.abs(signal))
-    shape_factor = rms / abs_mean if abs_mean > 0 else 0
-    impulse_factor = peak / abs_mean if abs_mean > 0 else 0
-    
-    freqs, psd = welch(signal, fs=12000, nperseg=1024)
-    freq_mean = np.sum(freqs * psd) / np.sum(psd)
-    freq_std = np.sqrt(np.sum(((freqs - freq_mean)**2) * psd) / np.sum(psd))
-    freq_peak = freqs[np.argmax(psd)]
-    
-    return np.array([mean, std, rms, peak, peak_to_peak, crest_factor, 
-                     skewness, kurtosis, clearance_factor, shape_factor, 
-                     impulse_factor, freq_mean, freq_std, freq_peak])
+    """Extract features with the shared batch engine"""
+    return extract_features_batch(signal)[0]
 
 # Load model
 model = joblib.load('backend/models/rf_model_real.pkl')
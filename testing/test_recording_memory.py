@@ -0,0 +1,65 @@
+import os
+import sys
+import tracemalloc
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+# Peak memory of /predict/recording must follow the chunk budget, not window x windows-per-chunk
+MAX_PEAK_MB = 200
+
+
+def check_chunk_shapes(signal):
+    """1. Chunk shapes stay within the sample budget for any window size"""
+    from app.main import RECORDING_CHUNK_SAMPLES, recording_chunk_windows
+    from app.segmentation import iter_segment_chunks
+
+    print("\n1. CHUNK SHAPES:")
+    failures = 0
+    for window, hop in [(2400, 1200), (48000, 1), (96000, 1)]:
+        chunk_windows = recording_chunk_windows(window)
+        largest = max(chunk.shape[0] for _, chunk in iter_segment_chunks(signal, window, hop, chunk_windows))
+        ok = largest * window <= max(RECORDING_CHUNK_SAMPLES, window)
+        failures += not ok
+        print(f"   {'✅' if ok else '❌'} window={window} hop={hop}: {largest} windows "
+              f"({largest * window:,} samples) per chunk")
+    return failures
+
+
+def check_peak_memory(signal):
+    """2. Peak allocation for a large window with a one-sample hop"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    print("\n2. PEAK MEMORY (window=48000, hop=1, 0.39 MB body):")
+    with TestClient(app) as client:
+        tracemalloc.start()
+        response = client.post(
+            "/predict/recording?window=48000&hop=1", content=signal.tobytes(),
+            headers={"content-type": "application/octet-stream"}
+        )
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+    body = response.json() if response.status_code == 200 else {}
+    windows = sum(segment["windows"] for segment in body.get("segments", []))
+    ok = (response.status_code == 200 and body["count"] == windows == len(signal) - 48000 + 1
+          and peak_mb < MAX_PEAK_MB)
+    print(f"   {'✅' if ok else '❌'} status {response.status_code}, {len(body.get('segments', []))} segments, "
+          f"peak {peak_mb:.0f} MB (limit {MAX_PEAK_MB} MB)")
+    return int(not ok)
+
+
+if __name__ == "__main__":
+    os.chdir(BACKEND_DIR)
+
+    print("=" * 60)
+    print("TESTING /predict/recording MEMORY BOUNDS")
+    print("=" * 60)
+
+    signal = np.random.default_rng(0).normal(size=100_000).astype(np.float32)
+    failures = check_chunk_shapes(signal) + check_peak_memory(signal)
+
+    print(f"\n{'✅ All checks passed' if not failures else f'❌ {failures} check(s) failed'}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,70 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.features import FEATURE_NAMES, extract_features
+from app.streaming import SlidingWindowFeatures
+
+WINDOW = 1024
+# Relative tolerance against batch extraction, on top of a small absolute floor
+RTOL = 1e-6
+ATOL = 1e-9
+
+
+def compare(label, sliding):
+    """Print and count features that differ from batch extraction of the same window"""
+    expected = extract_features(sliding.window_values())
+    actual = sliding.features()
+    bad = [name for name in FEATURE_NAMES
+           if not np.isclose(actual[name], expected[name], rtol=RTOL, atol=ATOL)]
+    print(f"   {'✅' if not bad else '❌'} {label}")
+    for name in bad:
+        print(f"      {name}: sliding {actual[name]:.10g} vs batch {expected[name]:.10g}")
+    return int(bool(bad))
+
+
+def run_checks():
+    rng = np.random.default_rng(0)
+    failures = 0
+
+    # 1. Zero-mean signal, checked after every resync interval
+    print("\n1. ZERO-MEAN SIGNAL:")
+    sliding = SlidingWindowFeatures(WINDOW)
+    signal = rng.normal(size=WINDOW * 3 + 700)
+    sliding.extend(signal[:WINDOW])
+    for step in (1, 500, WINDOW - 1, 700):
+        sliding.extend(signal[sliding._count:sliding._count + step])
+        failures += compare(f"after {sliding._count} samples", sliding)
+
+    # 2. Large DC offset: raw power sums cancel here, offsets from the reference do not
+    print("\n2. DC OFFSET (mean 100, std 0.01):")
+    sliding = SlidingWindowFeatures(WINDOW)
+    signal = 100 + 0.01 * rng.normal(size=WINDOW * 2)
+    signal[WINDOW + 300:] += 0.05 * np.sin(np.arange(WINDOW - 300) / 7)
+    sliding.extend(signal[:WINDOW])
+    failures += compare("full window", sliding)
+    for value in signal[WINDOW:WINDOW + WINDOW // 2]:
+        sliding.push(value)
+    failures += compare("half a window after the last resync", sliding)
+
+    # 3. Offset that drifts between resyncs
+    print("\n3. DRIFTING OFFSET (0 -> 1000 over two windows):")
+    sliding = SlidingWindowFeatures(WINDOW)
+    signal = np.linspace(0, 1000, WINDOW * 2) + 0.01 * rng.normal(size=WINDOW * 2)
+    sliding.extend(signal[:WINDOW])
+    for value in signal[WINDOW:WINDOW + WINDOW - 1]:
+        sliding.push(value)
+    failures += compare("one sample before the next resync", sliding)
+
+    return failures
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("TESTING INCREMENTAL STREAMING FEATURES")
+    print("=" * 60)
+
+    failures = run_checks()
+    print(f"\n{'✅ All checks passed' if not failures else f'❌ {failures} check(s) failed'}")
+    sys.exit(1 if failures else 0)
@@ -1,113 +1,42 @@
 import numpy as np
 import pandas as pd
-from scipy.io import loadmat
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import classification_report, confusion_matrix
 import joblib
 import os
-from scipy import stats
-from scipy.signal import welch
+import sys
 
-def extract_features(signal):
-    """Extract time and frequency domain features"""
-    features = {}
-    
-    # Time domain features
-    features['mean'] = np.mean(signal)
-    features['std'] = np.std(signal)
-    features['rms'] = np.sqrt(np.mean(signal**2))
-    features['peak'] = np.max(np.abs(signal))
-    features['peak_to_peak'] = np.ptp(signal)
-    features['crest_factor'] = features['peak'] / features['rms'] if features['rms'] != 0 else 0
-    features['skewness'] = stats.skew(signal)
-    features['kurtosis'] = stats.kurtosis(signal)
-    features['clearance_factor'] = features['peak'] / (np.mean(np.sqrt(np.abs(signal)))**2) if np.mean(np.sqrt(np.abs(signal))) != 0 else 0
-    features['shape_factor'] = features['rms'] / np.mean(np.abs(signal)) if np.mean(np.abs(signal)) != 0 else 0
-    features['impulse_factor'] = features['peak'] / np.mean(np.abs(signal)) if np.mean(np.abs(signal)) != 0 else 0
-    
-    # Frequency domain features
-    freqs, psd = welch(signal, fs=12000, nperseg=1024)
-    features['freq_mean'] = np.sum(freqs * psd) / np.sum(psd)
-    features['freq_std'] = np.sqrt(np.sum(((freqs - features['freq_mean'])**2) * psd) / np.sum(psd))
-    features['freq_peak'] = freqs[np.argmax(psd)]
-    
-    return features
+# Share the serving feature engine so training and inference cannot drift
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.features import FEATURE_NAMES
+from dataset_builder import DatasetBuilder, cwru_files
 
-def load_cwru_data(file_path):
-    """Load CWRU .mat file and extract drive end bearing data"""
-    mat_data = loadmat(file_path)
-    
-    # CWRU data structure - find the drive end bearing data key
-    # Keys typically end with '_DE_time'
-    de_keys = [key for key in mat_data.keys() if 'DE_time' in key]
-    
-    if de_keys:
-        signal = mat_data[de_keys[0]].flatten()
-        return signal
-    else:
-        raise ValueError(f"No drive end data found in {file_path}")
-
-def segment_signal(signal, segment_length=2400, overlap=0.5):
-    """Split signal into overlapping segments"""
-    step = int(segment_length * (1 - overlap))
-    segments = []
-    
-    for i in range(0, len(signal) - segment_length + 1, step):
-        segments.append(signal[i:i + segment_length])
-    
-    return segments
-
-def prepare_dataset():
-    """Load and prepare CWRU dataset"""
+def prepare_dataset(feature_names=FEATURE_NAMES):
+    """Load and prepare CWRU dataset with the given feature columns"""
     data_dir = 'data/cwru_dataset'
     
-    X = []
-    y = []
-    
-    file_mapping = {
-        'normal_0.mat': 'normal',
-        'ball_007_0.mat': 'ball',
-        'inner_007_0.mat': 'inner_race',
-        'outer_007_0.mat': 'outer_race'
-    }
+    # Every normal_*/ball_*/inner_*/outer_* recording, so more load conditions
+    # can be added by dropping their .mat files into data_dir
+    file_mapping = cwru_files(data_dir)
     
     print("Loading CWRU dataset...")
     
-    for filename, label in file_mapping.items():
-        file_path = os.path.join(data_dir, filename)
-        
-        if not os.path.exists(file_path):
-            print(f"⚠️  {filename} not found, skipping...")
-            continue
-        
-        print(f"Processing {filename} ({label})...")
-        
-        # Load signal
-        signal = load_cwru_data(file_path)
-        
-        # Segment signal
-        segments = segment_signal(signal, segment_length=2400)
-        
-        print(f"  Created {len(segments)} segments")
-        
-        # Extract features from each segment
-        for segment in segments:
-            features = extract_features(segment)
-            X.append(list(features.values()))
-            y.append(label)
+    # Features are cached per file; only new or changed recordings are extracted
+    builder = DatasetBuilder(data_dir, segment_length=2400, overlap=0.5, feature_names=feature_names)
+    X, y = builder.build(file_mapping)
     
     print(f"\n✅ Dataset prepared: {len(X)} samples, {len(set(y))} classes")
-    return np.array(X), np.array(y), list(features.keys())
+    return X, y, list(feature_names)
 
-def train_model():
+def train_model(feature_names=FEATURE_NAMES):
     """Train Random Forest on real CWRU data"""
     print("=" * 60)
     print("TRAINING WITH REAL CWRU BEARING DATASET")
     print("=" * 60)
     
     # Prepare dataset
-    X, y, feature_names = prepare_dataset()
+    X, y, feature_names = prepare_dataset(feature_names)
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
@@ -131,6 +60,9 @@ def train_model():
     
     rf_model.fit(X_train, y_train)
     
+    # Serving reads this to extract only these columns (app.features.model_feature_names)
+    rf_model.feature_names_ = list(feature_names)
+    
     # Evaluate
     print("\n" + "=" * 60)
     print("MODEL EVALUATION")
@@ -177,4 +109,8 @@ def train_model():
     return rf_model, feature_names
 
 if __name__ == "__main__":
-    train_model()
+    # Optional pruned feature set: python testing/train_real_model.py rms,kurtosis,crest_factor
+    if len(sys.argv) > 1:
+        train_model(feature_names=sys.argv[1].split(','))
+    else:
+        train_model()
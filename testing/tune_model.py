@@ -0,0 +1,183 @@
+import argparse
+import copy
+import itertools
+import os
+import pickle
+import sys
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from app.compiled_forest import compile_model
+from train_real_model import prepare_dataset
+
+warnings.filterwarnings('ignore')
+
+ESTIMATOR_STEPS = [25, 50, 100, 200]
+MAX_DEPTHS = [8, 12, 20, None]
+MIN_SAMPLES_LEAF = [1, 2, 4]
+MAX_FEATURES = ['sqrt', 0.5]
+
+
+def parse_grid(text, cast):
+    """'8,12,None' -> [8, 12, None]"""
+    return [None if value == 'None' else cast(value) for value in text.split(',')]
+
+
+def max_features_value(value):
+    return value if value in ('sqrt', 'log2') else float(value)
+
+
+def grow_forest(params, X_train, y_train, X_eval, y_eval, estimator_steps):
+    """
+    Fit one forest and grow it with warm_start through estimator_steps.
+    Returns the accuracy on (X_eval, y_eval) at every step and the final forest;
+    the forest at an earlier step is its first n trees.
+    """
+    forest = RandomForestClassifier(warm_start=True, random_state=42, n_jobs=1, **params)
+    scores = []
+    for n_estimators in estimator_steps:
+        forest.set_params(n_estimators=n_estimators)
+        forest.fit(X_train, y_train)
+        scores.append(forest.score(X_eval, y_eval))
+    return scores, forest
+
+
+def cv_task(params, fold, train_idx, eval_idx, X, y, estimator_steps):
+    scores, _ = grow_forest(params, X[train_idx], y[train_idx], X[eval_idx], y[eval_idx], estimator_steps)
+    return params, fold, scores
+
+
+def first_trees(forest, n_estimators):
+    """Copy of a fitted forest keeping only its first n trees"""
+    truncated = copy.copy(forest)
+    truncated.estimators_ = forest.estimators_[:n_estimators]
+    truncated.n_estimators = n_estimators
+    return truncated
+
+
+def single_row_latency_ms(model, X, repeats=200):
+    """Median latency of predict_proba on one row"""
+    row = X[:1]
+    model.predict_proba(row)  # warm-up
+    samples = []
+    for i in range(repeats):
+        row = X[i % len(X):i % len(X) + 1]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        samples.append((time.perf_counter() - start) * 1000)
+    return float(np.median(samples))
+
+
+def pareto_front(df, maximize, minimize):
+    """Boolean mask of rows no other row matches or beats on every objective (and beats on one)"""
+    values = np.column_stack([df[col].to_numpy() for col in maximize] +
+                             [-df[col].to_numpy() for col in minimize])
+    dominated = np.zeros(len(df), dtype=bool)
+    for i in range(len(df)):
+        at_least = (values >= values[i]).all(axis=1)
+        better = (values > values[i]).any(axis=1)
+        dominated[i] = (at_least & better).any()
+    return ~dominated
+
+
+def tune(estimator_steps=ESTIMATOR_STEPS, max_depths=MAX_DEPTHS, min_samples_leaf=MIN_SAMPLES_LEAF,
+         max_features=MAX_FEATURES, folds=5, n_jobs=-1, backend='compiled'):
+    """Cross-validated accuracy, latency and size for every configuration and forest size"""
+    # Same split as train_model; features come from the dataset builder's cache
+    X, y, _ = prepare_dataset()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    configs = [
+        {'max_depth': depth, 'min_samples_leaf': leaf, 'max_features': features}
+        for depth, leaf, features in itertools.product(max_depths, min_samples_leaf, max_features)
+    ]
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(X_train, y_train))
+    print(f"\n🔍 {len(configs)} configurations x {folds} folds, "
+          f"n_estimators {estimator_steps} grown with warm_start")
+
+    parallel = Parallel(n_jobs=n_jobs)
+    start = time.perf_counter()
+    cv_results = parallel(
+        delayed(cv_task)(params, fold, train_idx, eval_idx, X_train, y_train, estimator_steps)
+        for params in configs for fold, (train_idx, eval_idx) in enumerate(splits)
+    )
+    print(f"   Cross-validation: {time.perf_counter() - start:.1f}s")
+
+    # One final forest per configuration on the whole training split
+    start = time.perf_counter()
+    finals = parallel(
+        delayed(grow_forest)(params, X_train, y_train, X_test, y_test, estimator_steps)
+        for params in configs
+    )
+    print(f"   Final fits: {time.perf_counter() - start:.1f}s")
+
+    fold_scores = {}
+    for params, _, scores in cv_results:
+        fold_scores.setdefault(repr(params), []).append(scores)
+
+    # Latency and size are measured here, one model at a time, not under the parallel load
+    rows = []
+    for params, (test_scores, forest) in zip(configs, finals):
+        cv = np.array(fold_scores[repr(params)])  # (folds, steps)
+        for step, n_estimators in enumerate(estimator_steps):
+            model = first_trees(forest, n_estimators)
+            served = compile_model(model, backend, check_rows=None)
+            rows.append({
+                **params,
+                'max_depth': 'None' if params['max_depth'] is None else params['max_depth'],
+                'n_estimators': n_estimators,
+                'cv_accuracy': cv[:, step].mean(),
+                'cv_std': cv[:, step].std(),
+                'test_accuracy': test_scores[step],
+                'latency_ms': single_row_latency_ms(served, X_test),
+                'model_kb': len(pickle.dumps(model)) / 1024
+            })
+
+    df = pd.DataFrame(rows)
+    df['pareto'] = pareto_front(df, maximize=['cv_accuracy'], minimize=['latency_ms', 'model_kb'])
+    return df.sort_values(['pareto', 'cv_accuracy'], ascending=[False, False]).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Random Forest accuracy vs latency vs size search")
+    parser.add_argument('--estimators', default=','.join(map(str, ESTIMATOR_STEPS)))
+    parser.add_argument('--max-depth', default=','.join(map(str, MAX_DEPTHS)))
+    parser.add_argument('--min-samples-leaf', default=','.join(map(str, MIN_SAMPLES_LEAF)))
+    parser.add_argument('--max-features', default=','.join(map(str, MAX_FEATURES)))
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=-1)
+    parser.add_argument('--backend', default='compiled', choices=['sklearn', 'compiled'])
+    parser.add_argument('--out', help="Write the full table to this CSV file")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🌲 RANDOM FOREST TUNING")
+    print("=" * 80)
+
+    results = tune(
+        estimator_steps=sorted(parse_grid(args.estimators, int)),
+        max_depths=parse_grid(args.max_depth, int),
+        min_samples_leaf=parse_grid(args.min_samples_leaf, int),
+        max_features=parse_grid(args.max_features, max_features_value),
+        folds=args.folds,
+        n_jobs=args.jobs,
+        backend=args.backend
+    )
+
+    pd.set_option('display.width', 160)
+    print(f"\n⭐ Pareto front (cv accuracy vs {args.backend} single-row latency vs pickled size):")
+    print(results[results['pareto']].drop(columns='pareto').to_string(float_format='%.4f'))
+    print(f"\n{len(results)} candidates, {int(results['pareto'].sum())} on the front")
+
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"✅ Full table saved to {args.out}")